@@ -0,0 +1,83 @@
+"""
+Latency, REST calls and tasks to enqueue a 10k tracks playlist, one
+:meth:`Player.play` per track against a single :meth:`Player.play_tracks`.
+
+run: ``python benchmarks/bulk_enqueue.py``
+"""
+import asyncio
+import pathlib
+import sys
+import time
+import types
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from lavaplay.objects import Track  # noqa: E402
+from lavaplay.player import Player  # noqa: E402
+
+COUNT = 10_000
+# simulated round trip of an update_player request
+LATENCY = 0.005
+
+
+class FakeRest:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def update_player(self, **kwargs) -> dict:
+        self.calls += 1
+        await asyncio.sleep(LATENCY)
+        return {}
+
+
+def make_tracks() -> list:
+    return [
+        Track(f"encoded-{i}", f"id-{i}", True, "author", 1000, False, 0, f"title {i}", "uri", None, None, {}, "playlist")
+        for i in range(COUNT)
+    ]
+
+
+async def run(name: str, enqueue) -> None:
+    loop = asyncio.get_running_loop()
+    rest = FakeRest()
+    node = types.SimpleNamespace(rest=rest, user_id=1, loop=loop, session_id="session", queue_store=None, prefetch=0)
+    player = Player(node, 1)
+    tasks = 0
+    factory = loop.get_task_factory()
+
+    def counting_factory(loop, coro, **kwargs):
+        nonlocal tasks
+        tasks += 1
+        return factory(loop, coro, **kwargs) if factory else asyncio.Task(coro, loop=loop, **kwargs)
+
+    tracks = make_tracks()
+    loop.set_task_factory(counting_factory)
+    start = time.perf_counter()
+    await enqueue(player, tracks)
+    elapsed = time.perf_counter() - start
+    loop.set_task_factory(factory)
+    assert len(player.queue) == COUNT
+    print(f"{name:<18}{elapsed * 1000:>10.1f} ms{rest.calls:>8} rest calls{tasks:>8} tasks")
+
+
+async def play_each(player: Player, tracks: list) -> None:
+    for track in tracks:
+        await player.play(track)
+
+
+async def play_each_tasks(player: Player, tracks: list) -> None:
+    await asyncio.gather(*(player.play(track) for track in tracks))
+
+
+async def play_tracks(player: Player, tracks: list) -> None:
+    await player.play_tracks(tracks)
+
+
+async def main() -> None:
+    await run("play per track", play_each)
+    await run("gathered plays", play_each_tasks)
+    await run("play_tracks", play_tracks)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
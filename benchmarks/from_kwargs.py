@@ -0,0 +1,51 @@
+"""
+Per-object construction cost of :meth:`BaseObject.from_kwargs` for the objects
+built from every ``playerUpdate`` and ``stats`` websocket op.
+
+run: ``python benchmarks/from_kwargs.py``
+"""
+import pathlib
+import sys
+import timeit
+from inspect import signature
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from lavaplay.objects import Cpu, FrameStats, Memory, PlayerState  # noqa: E402
+
+NUMBER = 100_000
+
+
+def from_kwargs_signature(cls, **kwargs):
+    """The previous implementation, introspects the signature on every call."""
+    cls_fields = {field for field in signature(cls).parameters}
+    native_args, new_args = {}, {}
+    for name, val in kwargs.items():
+        if name in cls_fields:
+            native_args[name] = val
+        else:
+            new_args[name] = val
+    ret = cls(**native_args)
+    for new_name, new_val in new_args.items():
+        setattr(ret, new_name, new_val)
+    return ret
+
+
+PAYLOADS = [
+    (PlayerState, {"time": 1500467109, "position": 60000, "connected": True, "ping": 50}),
+    (Memory, {"free": 123, "used": 456, "allocated": 789, "reservable": 1234}),
+    (Cpu, {"cores": 4, "systemLoad": 0.5, "lavalinkLoad": 0.5}),
+    (FrameStats, {"sent": 6000, "nulled": 10, "deficit": -3010}),
+]
+
+
+def main():
+    print(f"{'object':<14}{'signature (us)':>16}{'cached (us)':>14}{'speedup':>10}")
+    for cls, payload in PAYLOADS:
+        before = timeit.timeit(lambda: from_kwargs_signature(cls, **payload), number=NUMBER)
+        after = timeit.timeit(lambda: cls.from_kwargs(**payload), number=NUMBER)
+        print(f"{cls.__name__:<14}{before / NUMBER * 1e6:>16.3f}{after / NUMBER * 1e6:>14.3f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Decode time of lavalink payloads for every installed json backend, a ``playerUpdate``
+websocket frame and a 1000 tracks ``loadtracks`` playlist response.
+
+The payloads follow the examples of the lavalink v4 api docs.
+
+run: ``python benchmarks/json_decode.py``
+"""
+import json
+import pathlib
+import sys
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from lavaplay import jsonlib  # noqa: E402
+
+PLAYER_UPDATE = json.dumps({
+    "op": "playerUpdate",
+    "guildId": "817327181659111454",
+    "state": {"time": 1500467109, "position": 60000, "connected": True, "ping": 50}
+})
+
+PLAYLIST = json.dumps({
+    "loadType": "playlist",
+    "data": {
+        "info": {"name": "Example YouTube Playlist", "selectedTrack": 3},
+        "pluginInfo": {},
+        "tracks": [
+            {
+                "encoded": "QAAAjQIAJVJpY2sgQXN0bGV5IC0gTmV2ZXIgR29ubmEgR2l2ZSBZb3UgVXAADlJpY2tBc3RsZXlWRVZPAAAAAAADPCAAC2RRdzR3OVdnWGNRAAEAK2h0dHBzOi8vd3d3LnlvdXR1YmUuY29tL3dhdGNoP3Y9ZFF3NHc5V2dYY1EAB3lvdXR1YmUAAAAAAAAAAA==",
+                "info": {
+                    "identifier": f"dQw4w9W{i:04d}",
+                    "isSeekable": True,
+                    "author": "RickAstleyVEVO",
+                    "length": 212000,
+                    "isStream": False,
+                    "position": 0,
+                    "title": f"Rick Astley - Never Gonna Give You Up ({i})",
+                    "uri": f"https://www.youtube.com/watch?v=dQw4w9W{i:04d}",
+                    "artworkUrl": f"https://i.ytimg.com/vi/dQw4w9W{i:04d}/maxresdefault.jpg",
+                    "isrc": None,
+                    "sourceName": "youtube"
+                },
+                "pluginInfo": {},
+                "userData": {}
+            }
+            for i in range(1000)
+        ]
+    }
+}).encode()
+
+
+def main():
+    print(f"playlist size: {len(PLAYLIST) / 1024:.0f} KiB")
+    print(f"{'backend':<10}{'frame (us)':>12}{'playlist (ms)':>16}")
+    for name in jsonlib.BACKENDS:
+        try:
+            jsonlib.use(name)
+        except ImportError:
+            print(f"{name:<10}{'not installed':>28}")
+            continue
+        frame = min(timeit.repeat(lambda: jsonlib.loads(PLAYER_UPDATE), number=100_000, repeat=3)) / 100_000
+        playlist = min(timeit.repeat(lambda: jsonlib.loads(PLAYLIST), number=50, repeat=3)) / 50
+        print(f"{name:<10}{frame * 1e6:>12.2f}{playlist * 1e3:>16.2f}")
+    jsonlib.use()
+
+
+if __name__ == "__main__":
+    main()
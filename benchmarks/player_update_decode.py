@@ -0,0 +1,59 @@
+"""
+Replay of 1M ``playerUpdate`` frames, the previous decoding that changes the payload and
+builds the objects with :meth:`BaseObject.from_kwargs` against :mod:`lavaplay.schemas`.
+
+The frames are decoded from json on every replay like the websocket does, so the
+previous decoding is free to change them.
+
+run: ``python benchmarks/player_update_decode.py``
+"""
+import json
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from lavaplay import schemas  # noqa: E402
+from lavaplay.events import PlayerState, PlayerUpdateEvent  # noqa: E402
+
+COUNT = 1_000_000
+FRAMES = [
+    json.dumps({
+        "op": "playerUpdate",
+        "guildId": str(817327181659111454 + guild),
+        "state": {"time": 1500467109 + guild, "position": 60000 + guild, "connected": True, "ping": 50}
+    })
+    for guild in range(1000)
+]
+
+
+def decode_from_kwargs(payload: dict) -> PlayerUpdateEvent:
+    payload.pop("op")
+    position = payload["state"].get("position")
+    position = position / 1000 if isinstance(position, int) else None
+    payload["state"]["position"] = position
+    payload["state"] = PlayerState.from_kwargs(**payload["state"])
+    return PlayerUpdateEvent.from_kwargs(**payload)
+
+
+def replay(decode) -> float:
+    frames = FRAMES * (COUNT // len(FRAMES))
+    loads = json.loads
+    start = time.perf_counter()
+    for frame in frames:
+        decode(loads(frame))
+    return time.perf_counter() - start
+
+
+def main():
+    parse = replay(lambda payload: payload)
+    before = replay(decode_from_kwargs) - parse
+    after = replay(schemas.PLAYER_UPDATE.decode) - parse
+    print(f"frames: {COUNT}, json parsing excluded ({parse:.2f} s)")
+    print(f"from_kwargs: {before:6.2f} s  {before / COUNT * 1e6:6.2f} us/frame")
+    print(f"schema:      {after:6.2f} s  {after / COUNT * 1e6:6.2f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
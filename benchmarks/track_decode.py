@@ -0,0 +1,79 @@
+"""
+Track blobs decode throughput, the local decoder for 100k blobs against the
+lavalink ``decodetrack`` route served by a local aiohttp server.
+
+The REST path is measured on fewer calls with a server on localhost,
+so it is the best case without network latency or lavalink work.
+
+run: ``python benchmarks/track_decode.py``
+"""
+import asyncio
+import pathlib
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from lavaplay.codec import decode_track, encode_track  # noqa: E402
+from lavaplay.node_manager import Node  # noqa: E402
+from lavaplay.objects import Track  # noqa: E402
+
+LOCAL_COUNT = 100_000
+REST_COUNT = 1_000
+PORT = 23399
+
+
+def make_blobs(count: int) -> list:
+    return [
+        encode_track(Track(
+            None, f"dQw4w9W{i:06d}", True, "RickAstleyVEVO", 212000, False, 0,
+            f"Rick Astley - Never Gonna Give You Up {i}", f"https://www.youtube.com/watch?v=dQw4w9W{i:06d}",
+            f"https://i.ytimg.com/vi/dQw4w9W{i:06d}/maxresdefault.jpg", None, {}, None, source_name="youtube"
+        ))
+        for i in range(count)
+    ]
+
+
+async def decodetrack(request: web.Request) -> web.Response:
+    track = decode_track(request.query["encodedTrack"])
+    return web.json_response({
+        "encoded": track.encoded,
+        "info": {
+            "identifier": track.identifier, "isSeekable": track.is_seekable, "author": track.author,
+            "length": track.length, "isStream": track.is_stream, "position": track.position,
+            "title": track.title, "uri": track.uri, "artworkUrl": track.artworkUrl, "isrc": track.isrc,
+            "sourceName": track.source_name
+        },
+        "pluginInfo": {}
+    })
+
+
+async def main() -> None:
+    blobs = make_blobs(LOCAL_COUNT)
+
+    start = time.perf_counter()
+    for blob in blobs:
+        decode_track(blob)
+    local = time.perf_counter() - start
+
+    app = web.Application()
+    app.router.add_get("/v4/decodetrack", decodetrack)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+    node = Node(host="127.0.0.1", port=PORT, password="", user_id=None, loop=asyncio.get_running_loop())
+    start = time.perf_counter()
+    for blob in blobs[:REST_COUNT]:
+        await node.decodetrack(blob, local=False)
+    rest = time.perf_counter() - start
+    await node.close()
+    await runner.cleanup()
+
+    print(f"local: {LOCAL_COUNT / local:>10.0f} tracks/s  {local / LOCAL_COUNT * 1e6:8.2f} us/track  {local:6.2f} s for {LOCAL_COUNT}")
+    print(f"rest:  {REST_COUNT / rest:>10.0f} tracks/s  {rest / REST_COUNT * 1e6:8.2f} us/track  {rest / REST_COUNT * LOCAL_COUNT:6.2f} s for {LOCAL_COUNT} (estimated)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
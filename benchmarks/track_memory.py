@@ -0,0 +1,93 @@
+"""
+Bytes per :class:`Track` for a 100k tracks queue, the slotted track with shared strings and
+plugin info against the same dataclass with a per-instance ``__dict__`` built like before,
+with its own ``author`` string and ``pluginInfo`` dict for every track.
+
+run: ``python benchmarks/track_memory.py``
+"""
+import dataclasses
+import json
+import pathlib
+import sys
+import tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from lavaplay.objects import Track  # noqa: E402
+from lavaplay.utlits import prossing_tracks  # noqa: E402
+
+COUNT = 100_000
+
+DictTrack = dataclasses.make_dataclass(
+    "DictTrack",
+    [(field.name, field.type, field) for field in dataclasses.fields(Track)],
+)
+
+
+def playlist_json() -> str:
+    tracks = [
+        {
+            "encoded": f"QAAAjQIAJVJpY2sgQXN0bGV5IC0gTmV2ZXIgR29ubmEgR2l2ZSBZb3UgVXAADlJpY2tBc3RsZXlWRVZPAAAAAAADPCAAC2RRdzR3OVdnWGNR{index:06d}",
+            "info": {
+                "identifier": f"dQw4w9W{index:06d}",
+                "isSeekable": True,
+                "author": "RickAstleyVEVO",
+                "length": 212000,
+                "isStream": False,
+                "position": 0,
+                "title": f"Rick Astley - Never Gonna Give You Up {index}",
+                "uri": f"https://www.youtube.com/watch?v=dQw4w9W{index:06d}",
+                "artworkUrl": None,
+                "isrc": None,
+                "sourceName": "youtube",
+            },
+            "pluginInfo": {},
+        }
+        for index in range(COUNT)
+    ]
+    return json.dumps({"loadType": "playlist", "data": {"tracks": tracks}})
+
+
+def build_dict_tracks(tracks, result):
+    return [
+        DictTrack(
+            encoded=track.get("encoded"),
+            identifier=track["info"]["identifier"],
+            is_seekable=track["info"]["isSeekable"],
+            author=track["info"]["author"],
+            length=track["info"]["length"],
+            is_stream=track["info"]["isStream"],
+            position=track["info"]["position"],
+            title=track["info"]["title"],
+            uri=track["info"]["uri"],
+            artworkUrl=track["info"].get("artworkUrl", None),
+            isrc=track["info"].get("isrc", None),
+            plugin_info=track["pluginInfo"],
+            load_type=result.get("loadType", None),
+            source_name=track["info"].get("sourceName", None),
+        )
+        for track in tracks
+    ]
+
+
+def measure(build, raw: str) -> float:
+    """Memory kept by the tracks once the decoded payload is released."""
+    tracemalloc.start()
+    result = json.loads(raw)
+    tracks = build(result["data"]["tracks"], result)
+    del result
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(tracks) == COUNT
+    return size / COUNT
+
+
+def main():
+    raw = playlist_json()
+    print(f"tracks: {COUNT}")
+    print(f"dict track:    {measure(build_dict_tracks, raw):8.1f} bytes/track")
+    print(f"slotted track: {measure(prossing_tracks, raw):8.1f} bytes/track")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,8 +14,16 @@ from .client import Lavalink
 from .objects import *
 from .events import *
 from .rest import RestApi
+from .scheduler import RequestScheduler
+from .queue import Queue
+from .cache import CacheBackend, CacheStats, MemoryCache, DiskCache
+from .queue_store import QueueStore, MemoryQueueStore, SQLiteQueueStore, LogQueueStore
+from .balancer import NodeStrategy, PenaltyStrategy, RoundRobinStrategy, RegionStrategy
 from .exceptions import (
     NodeError, FiltersError, VolumeError,
-    NotConnectedError, ConnectedError, TrackLoadFailed
+    NotConnectedError, ConnectedError, TrackLoadFailed,
+    TrackDecodeError
 )
+from .codec import decode_track, encode_track
 from .node_manager import Node
+from .sharding import ShardedLavalink, IPCBackend, LocalSocketBackend, shard_for
@@ -0,0 +1,100 @@
+import itertools
+import typing as t
+import logging
+if t.TYPE_CHECKING:
+    from .node_manager import Node
+
+_LOG = logging.getLogger("lavaplay.balancer")
+
+
+class NodeStrategy:
+    """
+    The base class for strategies used by :class:`Lavalink` to pick a node for new players.
+
+    Subclass it and override :meth:`select` to make a custom strategy.
+    """
+    def select(self, nodes: t.Sequence["Node"], guild_id: t.Optional[int] = None) -> t.Optional["Node"]:
+        """
+        Pick a node for a new player.
+
+        Parameters
+        ---------
+        nodes: :class:`list`
+            the connected nodes to choose from, never empty
+        guild_id: :class:`int` | :class:`None`
+            the guild id of the new player if known
+        """
+        raise NotImplementedError
+
+
+class PenaltyStrategy(NodeStrategy):
+    """
+    Pick the least loaded node, scored with the stats sent by the node.
+
+    The score is the sum of the playing players, a cpu penalty growing fast with
+    the system load, a penalty for the lavalink process load and penalties for
+    the nulled and deficit audio frames of the last minute.
+    """
+    @staticmethod
+    def penalty(node: "Node") -> float:
+        """
+        The load penalty of the node, lower is better.
+
+        Parameters
+        ---------
+        node: :class:`Node`
+            the node to score
+        """
+        stats = node.stats
+        if stats is None:
+            # no stats yet, only the players created from this client are known
+            return float(len(node.players))
+        player_penalty = stats.playingPlayers
+        cpu_penalty = 1.05 ** (100 * stats.cpu.systemLoad) * 10 - 10
+        lavalink_penalty = stats.cpu.lavalinkLoad * 10
+        frame_penalty = 0.0
+        if stats.frameStats is not None:
+            # a minute of audio is 3000 frames
+            deficit = max(stats.frameStats.deficit, 0)
+            nulled = max(stats.frameStats.nulled, 0)
+            frame_penalty += 1.03 ** (500 * (deficit / 3000)) * 600 - 600
+            frame_penalty += (1.03 ** (500 * (nulled / 3000)) * 300 - 300) * 2
+        return player_penalty + cpu_penalty + lavalink_penalty + frame_penalty
+
+    def select(self, nodes: t.Sequence["Node"], guild_id: t.Optional[int] = None) -> t.Optional["Node"]:
+        return min(nodes, key=self.penalty)
+
+
+class RoundRobinStrategy(NodeStrategy):
+    """
+    Pick the connected nodes in turn.
+    """
+    def __init__(self) -> None:
+        self._counter = itertools.count()
+
+    def select(self, nodes: t.Sequence["Node"], guild_id: t.Optional[int] = None) -> t.Optional["Node"]:
+        return nodes[next(self._counter) % len(nodes)]
+
+
+class RegionStrategy(NodeStrategy):
+    """
+    Pick a node in the region of the guild, see the ``region`` option of :class:`Node`.
+
+    Parameters
+    ---------
+    region_for: :class:`function`
+        return the region name for a guild id or ``None`` if unknown
+    fallback: :class:`NodeStrategy`
+        the strategy used between the nodes of the region, or all nodes if none is in the region.
+        default is :class:`PenaltyStrategy`
+    """
+    def __init__(self, region_for: t.Callable[[t.Optional[int]], t.Optional[str]], fallback: t.Optional[NodeStrategy] = None) -> None:
+        self.region_for = region_for
+        self.fallback = fallback or PenaltyStrategy()
+
+    def select(self, nodes: t.Sequence["Node"], guild_id: t.Optional[int] = None) -> t.Optional["Node"]:
+        region = self.region_for(guild_id)
+        in_region = [node for node in nodes if region is not None and node.region == region]
+        if not in_region:
+            _LOG.debug(f"No node in region {region}, using all nodes")
+        return self.fallback.select(in_region or nodes, guild_id)
@@ -0,0 +1,252 @@
+import json
+import time
+import asyncio
+import sqlite3
+import typing as t
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+_LOG = logging.getLogger("lavaplay.cache")
+
+
+@dataclass
+class CacheStats:
+    """
+    Hit and miss counters of a cache.
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expired: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        The ratio of lookups served from the cache.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CacheBackend:
+    """
+    The base class for the cache of load tracks results used by :class:`Node`.
+
+    The methods are async so a backend can be shared between processes, like a redis backend.
+    Values are the raw lavalink responses, the tracks are built from them on every lookup.
+    """
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> t.Optional[dict]:
+        """
+        Get a cached result, ``None`` if missing or expired.
+
+        Parameters
+        ---------
+        key: :class:`str`
+            the load tracks identifier
+        """
+        raise NotImplementedError
+
+    async def set(self, key: str, value: dict) -> None:
+        """
+        Cache a result.
+
+        Parameters
+        ---------
+        key: :class:`str`
+            the load tracks identifier
+        value: :class:`dict`
+            the load tracks result
+        """
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        """
+        Remove a cached result.
+        """
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        """
+        Remove all cached results.
+        """
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """
+    An in-memory LRU cache with a time to live for every entry.
+
+    Parameters
+    ---------
+    maxsize: :class:`int`
+        The max entries kept, the least recently used entry is removed first.
+    ttl: :class:`float`
+        How many seconds an entry stays valid.
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 600) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, t.Tuple[float, dict]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> t.Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.stats.expired += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: dict) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class DiskCache(CacheBackend):
+    """
+    A LRU cache with a time to live for every entry saved in a sqlite file, it is kept between restarts.
+
+    The queries run one by one in a thread of the cache, so a lookup never waits for the disk on
+    the event loop. the use times of the hits are kept in memory and written with the next change.
+
+    Parameters
+    ---------
+    path: :class:`str`
+        The sqlite file path.
+    maxsize: :class:`int`
+        The max entries kept, the least recently used entry is removed first.
+    ttl: :class:`float`
+        How many seconds an entry stays valid.
+    """
+    def __init__(self, path: str, maxsize: int = 10000, ttl: float = 3600) -> None:
+        super().__init__()
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # one thread keeps the queries in order, the connection is only used by it after this
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lavaplay-cache")
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tracks_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS tracks_cache_used_at ON tracks_cache (used_at)")
+        self._db.commit()
+        self._count: int = self._db.execute("SELECT COUNT(*) FROM tracks_cache").fetchone()[0]
+        # key -> the last hit time, not written yet
+        self._used: t.Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    async def _run(self, func: t.Callable[..., t.Any], *args: t.Any) -> t.Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _write_used(self, used: t.Dict[str, float]) -> None:
+        if used:
+            self._db.executemany(
+                "UPDATE tracks_cache SET used_at = ? WHERE key = ?", ((at, key) for key, at in used.items())
+            )
+
+    def _get(self, key: str, now: float) -> t.Tuple[bool, t.Optional[dict]]:
+        # returns if the entry expired and the value
+        row = self._db.execute("SELECT value, expires_at FROM tracks_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False, None
+        if row[1] <= now:
+            with self._db:
+                self._count -= self._db.execute("DELETE FROM tracks_cache WHERE key = ?", (key,)).rowcount
+            return True, None
+        return False, json.loads(row[0])
+
+    async def get(self, key: str) -> t.Optional[dict]:
+        now = time.time()
+        expired, value = await self._run(self._get, key, now)
+        if value is None:
+            if expired:
+                self._used.pop(key, None)
+                self.stats.expired += 1
+            self.stats.misses += 1
+            return None
+        self._used[key] = now
+        self.stats.hits += 1
+        return value
+
+    def _set(self, key: str, value: str, now: float, used: t.Dict[str, float]) -> int:
+        with self._db:
+            self._write_used(used)
+            if self._db.execute("SELECT 1 FROM tracks_cache WHERE key = ?", (key,)).fetchone() is None:
+                self._count += 1
+            self._db.execute(
+                "INSERT OR REPLACE INTO tracks_cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now)
+            )
+            overflow = self._count - self.maxsize
+            if overflow <= 0:
+                return 0
+            self._db.execute(
+                "DELETE FROM tracks_cache WHERE key IN (SELECT key FROM tracks_cache ORDER BY used_at LIMIT ?)",
+                (overflow,)
+            )
+            self._count -= overflow
+            return overflow
+
+    async def set(self, key: str, value: dict) -> None:
+        used, self._used = self._used, {}
+        used.pop(key, None)
+        self.stats.evictions += await self._run(self._set, key, json.dumps(value), time.time(), used)
+
+    def _delete(self, key: t.Optional[str], used: t.Dict[str, float]) -> None:
+        with self._db:
+            self._write_used(used)
+            if key is None:
+                self._db.execute("DELETE FROM tracks_cache")
+                self._count = 0
+            else:
+                self._count -= self._db.execute("DELETE FROM tracks_cache WHERE key = ?", (key,)).rowcount
+
+    async def delete(self, key: str) -> None:
+        used, self._used = self._used, {}
+        used.pop(key, None)
+        await self._run(self._delete, key, used)
+
+    async def clear(self) -> None:
+        self._used = {}
+        await self._run(self._delete, None, {})
+
+    def _close(self, used: t.Dict[str, float]) -> None:
+        with self._db:
+            self._write_used(used)
+        self._db.close()
+
+    def close(self) -> None:
+        """
+        Write the pending use times and close the sqlite file, after the running queries.
+        """
+        used, self._used = self._used, {}
+        self._executor.submit(self._close, used)
+        self._executor.shutdown(wait=True)
@@ -1,6 +1,9 @@
 import typing as t
 import logging
 from .node_manager import Node
+from .player import Player
+from .balancer import NodeStrategy, PenaltyStrategy
+from .events import NodeDisconnectedEvent
 import asyncio
 
 _LOG = logging.getLogger("lavaplay.client")
@@ -9,11 +12,20 @@ class Lavalink:
     """
     The main class for managing nodes.
     side note: to make connection must be use :meth:`Lavalink.create_node` or :meth:`Lavalink.destroy_node`.
+
+    Parameters
+    ---------
+    strategy: :class:`NodeStrategy`
+        The strategy to pick a node for new players, default is :class:`PenaltyStrategy` the least loaded node.
+    failover: :class:`bool`
+        Move the players of a disconnected node to the best connected node, default is ``True``.
     """
-    def __init__(self) -> None:
+    def __init__(self, strategy: t.Optional[NodeStrategy] = None, failover: bool = True) -> None:
         self._nodes: t.List[Node] = []
+        self.strategy: NodeStrategy = strategy or PenaltyStrategy()
+        self.failover = failover
 
-    def create_node(self, host: str, port: int, password: str, user_id: int, *, name: str = None, shard_count: int = None, ssl: bool = False, resume_key: str = None, resume_timeout: int = None, loop: t.Optional[asyncio.AbstractEventLoop] = None) -> Node:
+    def create_node(self, host: str, port: int, password: str, user_id: int, *, name: str = None, shard_count: int = None, ssl: bool = False, resume_key: str = None, resume_timeout: int = None, loop: t.Optional[asyncio.AbstractEventLoop] = None, **kwargs) -> Node:
         """
         Create a node for lavalink.
 
@@ -37,8 +49,15 @@ class Lavalink:
             The resume timeout for the node.
         loop: :class:`asyncio.AbstractEventLoop`
             The event loop for the node.
+        kwargs:
+            Extra options passed to :class:`Node`, like ``rest_pool_size``.
         """
-        node = Node(host=host, port=port, password=password, user_id=user_id, name=name, shard_count=shard_count, resume_key=resume_key, resume_timeout=resume_timeout, is_ssl=ssl, loop=loop)
+        if shard_count is not None:
+            kwargs["shards_count"] = shard_count
+        if resume_timeout is not None:
+            kwargs["resume_timeout"] = resume_timeout
+        node = Node(host=host, port=port, password=password, user_id=user_id, name=name, resume_key=resume_key, ssl=ssl, loop=loop, **kwargs)
+        node.event_manager.add_listener(NodeDisconnectedEvent, self._on_node_disconnected)
         self._nodes.append(node)
         return node
     
@@ -51,9 +70,41 @@ class Lavalink:
         node: :class:`Node`
             The node to destroy.
         """
-        node.close()
+        node.event_manager.remove_listener(NodeDisconnectedEvent, self._on_node_disconnected)
+        node.loop.create_task(node.close())
         self.nodes.remove(node)
 
+    async def _on_node_disconnected(self, event: NodeDisconnectedEvent) -> None:
+        if self.failover and event.node.players:
+            _LOG.warning(f"Node {event.node.name} disconnected, moving {len(event.node.players)} players")
+            await self.move_players(event.node, destroy=False)
+
+    async def move_players(self, node: Node, target: t.Optional[Node] = None, destroy: bool = True) -> None:
+        """
+        Move all players of a node to another node.
+
+        Parameters
+        ---------
+        node: :class:`Node`
+            The node to move the players from.
+        target: :class:`Node` | :class:`None`
+            The node to move the players to, default is the best connected node picked by the strategy for every player.
+        destroy: :class:`bool`
+            Destroy the players on the old node, disable it when the old node is not reachable.
+        """
+        candidates = [n for n in self._nodes if n is not node and n.is_connect and n.session_id]
+        if target is None and not candidates:
+            _LOG.warning(f"No connected node to move the players of node {node.name}")
+            return
+        moves = []
+        for player in node.get_players():
+            new_node = target or self.strategy.select(candidates, player.guild_id)
+            moves.append(player.move_to(new_node, destroy=destroy))
+        results = await asyncio.gather(*moves, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                _LOG.error(f"Failed to move a player from node {node.name}: {result!r}")
+
 
     @property
     def nodes(self) -> t.List[Node]:
@@ -65,6 +116,49 @@ class Lavalink:
     @property
     def default_node(self) -> Node:
         """
-        The default node.
+        The default node, the best connected node picked by the strategy or the first node if none is connected.
+        """
+        return self.best_node() or self._nodes[0]
+
+    def best_node(self, guild_id: t.Optional[int] = None) -> t.Optional[Node]:
+        """
+        Pick the best connected node with the strategy, return ``None`` if no node is connected.
+
+        Parameters
+        ---------
+        guild_id: :class:`int` | :class:`None`
+            The guild id of the new player.
+        """
+        nodes = [node for node in self._nodes if node.is_connect]
+        if not nodes:
+            return None
+        return self.strategy.select(nodes, guild_id)
+
+    def create_player(self, guild_id: int) -> Player:
+        """
+        Create a player on the best node, or return the existing player of the guild.
+
+        Parameters
+        ---------
+        guild_id: :class:`int`
+            The guild id for player.
+        """
+        player = self.get_player(guild_id)
+        if player is not None:
+            return player
+        return self.default_node.create_player(guild_id)
+
+    def get_player(self, guild_id: int) -> t.Optional[Player]:
+        """
+        Get the player of a guild from any node.
+
+        Parameters
+        ---------
+        guild_id: :class:`int`
+            The guild id for player.
         """
-        return self._nodes[0]
+        for node in self._nodes:
+            player = node.get_player(guild_id)
+            if player is not None:
+                return player
+        return None
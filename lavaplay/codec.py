@@ -0,0 +1,176 @@
+"""
+Decode and encode the lavaplayer track blobs sent by lavalink as ``encoded``, without a request to the node.
+
+The blob is a base64 message, a 4 bytes header with the size and flags followed by
+the track info in java ``DataOutput`` format, strings are modified utf-8 with a 2 bytes length.
+"""
+import base64
+import sys
+import struct
+import typing as t
+from .objects import Track, EMPTY_PLUGIN_INFO
+from .exceptions import TrackDecodeError
+
+# the newest track info version known, written by lavaplayer 2.x used by lavalink v4
+TRACK_INFO_VERSION = 3
+_TRACK_INFO_VERSIONED = 1
+
+_INT = struct.Struct(">i")
+_LONG = struct.Struct(">q")
+_USHORT = struct.Struct(">H")
+
+
+def _decode_utf(data: bytes) -> str:
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+    try:
+        # java modified utf-8 writes the null char as C0 80 and astral chars as surrogate pairs
+        raw = data.replace(b"\xc0\x80", b"\x00").decode("utf-8", "surrogatepass")
+        return raw.encode("utf-16-le", "surrogatepass").decode("utf-16-le")
+    except UnicodeError as error:
+        raise TrackDecodeError(f"Invalid string in the track data: {error}") from None
+
+
+def _encode_utf(value: str) -> bytes:
+    if value.isascii() and "\x00" not in value:
+        return value.encode("ascii")
+    # split astral chars to surrogate pairs like java strings
+    pairs = "".join(
+        chr(0xD800 + ((ord(char) - 0x10000) >> 10)) + chr(0xDC00 + ((ord(char) - 0x10000) & 0x3FF))
+        if ord(char) > 0xFFFF else char
+        for char in value
+    )
+    return pairs.encode("utf-8", "surrogatepass").replace(b"\x00", b"\xc0\x80")
+
+
+class _Reader:
+    __slots__ = ("data", "offset")
+
+    def __init__(self, data: bytes, offset: int = 0) -> None:
+        self.data = data
+        self.offset = offset
+
+    def read(self, size: int) -> bytes:
+        end = self.offset + size
+        if end > len(self.data):
+            raise TrackDecodeError("Unexpected end of the track data")
+        value = self.data[self.offset:end]
+        self.offset = end
+        return value
+
+    def read_byte(self) -> int:
+        return self.read(1)[0]
+
+    def read_bool(self) -> bool:
+        return self.read(1) != b"\x00"
+
+    def read_long(self) -> int:
+        return _LONG.unpack(self.read(8))[0]
+
+    def read_utf(self) -> str:
+        size = _USHORT.unpack(self.read(2))[0]
+        return _decode_utf(self.read(size))
+
+    def read_nullable_utf(self) -> t.Optional[str]:
+        return self.read_utf() if self.read_bool() else None
+
+
+def decode_track(encoded: str) -> Track:
+    """
+    Decode a track blob to a :class:`Track`, the same result as the lavalink ``decodetrack`` route
+    without the plugin info.
+
+    Parameters
+    ---------
+    encoded: :class:`str`
+        the base64 track blob
+
+    Raises
+    --------
+    :exc:`.TrackDecodeError`
+        if the blob is invalid or its version is unknown.
+    """
+    try:
+        data = base64.b64decode(encoded)
+    except ValueError as error:
+        raise TrackDecodeError(f"Invalid base64 track data: {error}") from None
+    if len(data) < 4:
+        raise TrackDecodeError("Unexpected end of the track data")
+    header = _INT.unpack_from(data)[0]
+    size = header & 0x3FFFFFFF
+    flags = (header >> 30) & 0x3
+    end = 4 + size
+    if size < 8 or end > len(data):
+        raise TrackDecodeError("Invalid track data size")
+
+    reader = _Reader(data[:end], 4)
+    version = reader.read_byte() if flags & _TRACK_INFO_VERSIONED else 1
+    if version > TRACK_INFO_VERSION:
+        raise TrackDecodeError(f"Unknown track info version {version}")
+    title = reader.read_utf()
+    author = reader.read_utf()
+    length = reader.read_long()
+    identifier = reader.read_utf()
+    is_stream = reader.read_bool()
+    uri = reader.read_nullable_utf() if version >= 2 else None
+    artwork_url = reader.read_nullable_utf() if version >= 3 else None
+    isrc = reader.read_nullable_utf() if version >= 3 else None
+    source_name = reader.read_utf()
+    # the source data has a size only known by its source manager, the position is always last
+    position = _LONG.unpack_from(data, end - 8)[0]
+
+    return Track(
+        encoded=encoded,
+        identifier=identifier,
+        is_seekable=not is_stream,
+        author=sys.intern(author),
+        length=length,
+        is_stream=is_stream,
+        position=position,
+        title=title,
+        uri=uri,
+        artworkUrl=artwork_url,
+        isrc=isrc,
+        plugin_info=EMPTY_PLUGIN_INFO,
+        load_type=None,
+        source_name=sys.intern(source_name)
+    )
+
+
+def encode_track(track: Track, source_data: bytes = b"") -> str:
+    """
+    Encode a :class:`Track` to a blob of the newest version.
+
+    Parameters
+    ---------
+    track: :class:`Track`
+        the track to encode
+    source_data: :class:`bytes`
+        the data written by the source manager after the source name, empty for youtube and soundcloud,
+        other sources like http need it to play the track.
+    """
+    def utf(value: str) -> bytes:
+        data = _encode_utf(value)
+        return _USHORT.pack(len(data)) + data
+
+    def nullable_utf(value: t.Optional[str]) -> bytes:
+        return b"\x01" + utf(value) if value is not None else b"\x00"
+
+    body = b"".join((
+        bytes((TRACK_INFO_VERSION,)),
+        utf(track.title or ""),
+        utf(track.author or ""),
+        _LONG.pack(track.length),
+        utf(track.identifier),
+        b"\x01" if track.is_stream else b"\x00",
+        nullable_utf(track.uri),
+        nullable_utf(track.artworkUrl),
+        nullable_utf(track.isrc),
+        utf(track.source_name or ""),
+        source_data,
+        _LONG.pack(track.position or 0),
+    ))
+    header = _INT.pack((_TRACK_INFO_VERSIONED << 30) | len(body))
+    return base64.b64encode(header + body).decode()
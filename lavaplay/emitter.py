@@ -1,24 +1,116 @@
 import asyncio
+import time
 import typing as t
-from collections import deque
 import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
 from .events import Event
 
 _LOG = logging.getLogger("lavaplay.emitter")
 
+OVERFLOW_POLICIES = ("drop_oldest", "block", "coalesce")
+
+DEFAULT_OVERFLOW_BY_EVENT = {
+    "PlayerUpdateEvent": "drop_oldest",
+    "PlayerUpdateBatchEvent": "drop_oldest",
+}
+"""The overflow policies used by default, only the player updates are dropped, a newer one follows soon."""
+
+
+@dataclass
+class ListenerLatency:
+    """
+    The time spent in the listeners of an event.
+    """
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def average(self) -> float:
+        """
+        The average time in seconds of one listener call.
+        """
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass
+class EmitterMetrics:
+    """
+    The counters of the bounded dispatch mode of :class:`Emitter`.
+    """
+    dispatched: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    blocked: int = 0
+    latency: t.Dict[str, ListenerLatency] = field(default_factory=dict)
+
+
 class Emitter:
     """
     The class is a manger event from websocket.
 
+    Listeners are indexed by event name, so adding, removing and dispatching
+    never scans listeners registered for other events.
+
+    By default every listener call is a new task. When ``max_workers`` is set the events are
+    queued by name and a fixed number of workers call the listeners, a full queue is handled
+    by the overflow policy:
+
+    - ``drop_oldest`` drop the oldest queued event of the same name.
+    - ``block`` wait for space in :meth:`dispatch`, the websocket stops reading while the handled frames are
+      waiting. :meth:`emit` can't wait so the event is queued over the limit.
+    - ``coalesce`` keep only the newest queued event by guild, the oldest is dropped if still full.
+
+    By default the player update events are dropped and the other events block, see :data:`DEFAULT_OVERFLOW_BY_EVENT`.
+
     Parameters
     ---------
     loop: :class:`AbstractEventLoop`
         a loop event from asyncio
+    max_workers: :class:`int` | :class:`None`
+        the count of workers calling the listeners, ``None`` makes a task for every listener call.
+    max_queue: :class:`int`
+        the max queued events by event name.
+    overflow: :class:`str`
+        the overflow policy of the events not in ``overflow_by_event``, one of ``drop_oldest``, ``block`` or ``coalesce``.
+    overflow_by_event: :class:`dict` | :class:`None`
+        overflow policies by event name, like ``{"PlayerUpdateEvent": "coalesce"}``, merged to :data:`DEFAULT_OVERFLOW_BY_EVENT`.
     """
-    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        max_workers: t.Optional[int] = None,
+        max_queue: int = 1000,
+        overflow: str = "block",
+        overflow_by_event: t.Optional[t.Dict[str, str]] = None
+    ) -> None:
+        for policy in (overflow, *(overflow_by_event or {}).values()):
+            if policy not in OVERFLOW_POLICIES:
+                raise ValueError(f"Unknown overflow policy {policy}, must be one of {', '.join(OVERFLOW_POLICIES)}")
         self._loop = loop
-        self.listeners = deque()
-    
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.overflow_by_event = {**DEFAULT_OVERFLOW_BY_EVENT, **(overflow_by_event or {})}
+        self.metrics = EmitterMetrics()
+        # bounded mode state, created on the first event inside the running loop
+        self._queues: t.Dict[str, t.Union[t.Deque[t.Any], "OrderedDict[t.Any, t.Any]"]] = {}
+        self._pending: t.Optional[asyncio.Queue] = None
+        self._space: t.Optional[asyncio.Condition] = None
+        self._workers: t.List[asyncio.Task] = []
+        # event name -> insertion ordered listeners, a dict is used as an ordered set.
+        self._listeners: t.Dict[str, t.Dict[t.Callable, None]] = {}
+        # event name -> snapshot of the listeners used by emit, rebuilt after a change.
+        self._snapshots: t.Dict[str, t.Tuple[t.Callable, ...]] = {}
+
+    @property
+    def listeners(self) -> t.Dict[str, t.Tuple[t.Callable, ...]]:
+        """
+        All listeners grouped by event name.
+        """
+        return {event: tuple(funcs) for event, funcs in self._listeners.items()}
+
     def add_listener(self, event: t.Union[str, Event], func: t.Callable):
         """
         Add listener for listeners list.
@@ -32,7 +124,11 @@ class Emitter:
         """
         _LOG.debug(f"add listener {event}")
         event = event if isinstance(event, str) else event.__name__
-        self.listeners.append({"event": event, "func": func})
+        if not asyncio.iscoroutinefunction(func):
+            _LOG.error("Events only async function")
+            return
+        self._listeners.setdefault(event, {})[func] = None
+        self._snapshots.pop(event, None)
 
     def remove_listener(self, event: t.Union[str, Event], func: t.Callable):
         """
@@ -47,7 +143,24 @@ class Emitter:
         """
         _LOG.debug(f"remove listener {event}")
         event = event if isinstance(event, str) else event.__name__
-        self.listeners.remove([i for i in self.listeners if i["event"] == event and i["func"] == func])
+        funcs = self._listeners.get(event)
+        if funcs is None or funcs.pop(func, False) is False:
+            return
+        if not funcs:
+            del self._listeners[event]
+        self._snapshots.pop(event, None)
+
+    def has_listeners(self, event: t.Union[str, Event]) -> bool:
+        """
+        Check if any listener is registered for the event.
+
+        Parameters
+        ---------
+        event: :class:`str` | :class:`Any`
+            event name or class for event
+        """
+        event = event if isinstance(event, str) else event.__name__
+        return event in self._listeners
 
     def emit(self, event: t.Union[str, t.Any], data: t.Any):
         """
@@ -61,10 +174,141 @@ class Emitter:
             the data is revers to function callback
         """
         event_name = event if isinstance(event, str) else event.__name__
-        events = [i for i in self.listeners if i["event"] == event_name]
-        for event in events:
-            _LOG.debug(f"dispatch {event} for {len(events)} listeners")
-            if asyncio.iscoroutinefunction(event["func"]):
-                self._loop.create_task(event["func"](data))
-            else:
-                _LOG.error("Events only async function")
+        funcs = self._get_listeners(event_name)
+        if funcs is None:
+            return
+        if self.max_workers is not None:
+            self._enqueue(event_name, data, force=True)
+            return
+        _LOG.debug(f"dispatch {event_name} for {len(funcs)} listeners")
+        for func in funcs:
+            self._loop.create_task(func(data))
+
+    async def dispatch(self, event: t.Union[str, t.Any], data: t.Any):
+        """
+        Emit for event and wait for space in the queue with the ``block`` overflow policy.
+
+        Parameters
+        ---------
+        event: :class:`str` | :class:`Any`
+            event name or class for event
+        data: :class:`function`
+            the data is revers to function callback
+        """
+        event_name = event if isinstance(event, str) else event.__name__
+        if self.max_workers is None:
+            self.emit(event_name, data)
+            return
+        if self._get_listeners(event_name) is None:
+            return
+        if self._enqueue(event_name, data):
+            return
+        self.metrics.blocked += 1
+        while not self._enqueue(event_name, data):
+            async with self._space:
+                await self._space.wait()
+
+    def _get_listeners(self, event_name: str) -> t.Optional[t.Tuple[t.Callable, ...]]:
+        funcs = self._snapshots.get(event_name)
+        if funcs is None:
+            listeners = self._listeners.get(event_name)
+            if listeners is None:
+                return None
+            funcs = self._snapshots[event_name] = tuple(listeners)
+        return funcs
+
+    def _enqueue(self, event_name: str, data: t.Any, force: bool = False) -> bool:
+        """
+        Queue the event for the workers, return ``False`` if it must wait for space.
+        ``force`` queues a blocked event over the limit.
+        """
+        if self._pending is None:
+            self._pending = asyncio.Queue()
+            self._space = asyncio.Condition()
+            self._workers = [self._loop.create_task(self._worker()) for _ in range(self.max_workers)]
+        policy = self.overflow_by_event.get(event_name, self.overflow)
+        queue = self._queues.get(event_name)
+        if queue is None:
+            queue = self._queues[event_name] = OrderedDict() if policy == "coalesce" else deque()
+
+        if policy == "coalesce":
+            key = getattr(data, "guild_id", None) or getattr(data, "guildId", None)
+            if key in queue:
+                # the newest event takes the place of the queued one
+                queue[key] = data
+                self.metrics.coalesced += 1
+                return True
+            if len(queue) >= self.max_queue:
+                queue.popitem(last=False)
+                queue[key] = data
+                self.metrics.dropped += 1
+                return True
+            queue[key] = data
+        elif len(queue) >= self.max_queue:
+            if policy == "block":
+                if not force:
+                    return False
+                self.metrics.blocked += 1
+                queue.append(data)
+                self._pending.put_nowait(event_name)
+                return True
+            queue.popleft()
+            queue.append(data)
+            self.metrics.dropped += 1
+            return True
+        else:
+            queue.append(data)
+        self._pending.put_nowait(event_name)
+        return True
+
+    async def _worker(self):
+        while True:
+            event_name = await self._pending.get()
+            queue = self._queues[event_name]
+            data = queue.popitem(last=False)[1] if isinstance(queue, OrderedDict) else queue.popleft()
+            async with self._space:
+                # the waiters can wait for other events, all of them check again
+                self._space.notify_all()
+            funcs = self._get_listeners(event_name) or ()
+            latency = self.metrics.latency.get(event_name)
+            if latency is None:
+                latency = self.metrics.latency[event_name] = ListenerLatency()
+            self.metrics.dispatched += 1
+            for func in funcs:
+                start = time.perf_counter()
+                try:
+                    await func(data)
+                except Exception:
+                    _LOG.exception(f"Error in listener {func!r} of {event_name}")
+                elapsed = time.perf_counter() - start
+                latency.count += 1
+                latency.total += elapsed
+                if elapsed > latency.max:
+                    latency.max = elapsed
+
+    def queue_depth(self, event: t.Optional[t.Union[str, Event]] = None) -> int:
+        """
+        The count of queued events waiting for a worker.
+
+        Parameters
+        ---------
+        event: :class:`str` | :class:`Any` | :class:`None`
+            event name or class for event, ``None`` for all events
+        """
+        if event is None:
+            return sum(len(queue) for queue in self._queues.values())
+        event = event if isinstance(event, str) else event.__name__
+        queue = self._queues.get(event)
+        return len(queue) if queue is not None else 0
+
+    async def close(self):
+        """
+        Stop the workers, the queued events are dropped.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queues.clear()
+        self._pending = None
+        self._space = None
@@ -1,6 +1,8 @@
 from .objects import BaseObject, Stats, Track, PlayerState
 from dataclasses import dataclass
 import typing as t
+if t.TYPE_CHECKING:
+    from .node_manager import Node
 
 class Event(BaseObject):
     """
@@ -87,6 +89,14 @@ class PlayerUpdateEvent(Event):
     guildId: int
     state: PlayerState
 
+@dataclass
+class PlayerUpdateBatchEvent(Event):
+    """
+    Event on player updates batch. call every ``player_update_interval`` of the node
+    with the last update of the guilds updated in the interval.
+    """
+    updates: t.List[PlayerUpdateEvent]
+
 @dataclass
 class ErrorEvent(Event):
     """
@@ -94,3 +104,19 @@ class ErrorEvent(Event):
     """
     guild_id: int
     exception: Exception
+
+@dataclass
+class NodeDisconnectedEvent(Event):
+    """
+    Event on node disconnected. call when the websocket connection of the node is lost.
+    """
+    node: "Node"
+
+@dataclass
+class NodeReconnectingEvent(Event):
+    """
+    Event on node reconnecting. call before waiting to retry the websocket connection.
+    """
+    node: "Node"
+    attempt: int
+    delay: float
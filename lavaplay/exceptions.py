@@ -162,6 +162,28 @@ class TrackLoadFailed(Exception):
         """
         return self._causeStackTrace
 
+class TrackDecodeError(Exception):
+    """
+    A error for a track blob that can't be decoded locally.
+    
+    Parameters
+    ----------
+    message: :class:`str`
+        the error message
+    """
+    def __init__(self, message: str) -> None:
+        self._message = message
+
+    @property
+    def message(self):
+        """
+        A error message.
+        """
+        return self._message
+
+    def __str__(self):
+        return self._message
+
 class requestFailed(Exception):
     """
     A error for request failed.
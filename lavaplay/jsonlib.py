@@ -0,0 +1,70 @@
+"""
+The json backend used for websocket frames and REST bodies.
+
+The fastest installed library is used, ``orjson``, ``msgspec`` then ``ujson``, and
+the standard ``json`` module if none is installed. :func:`use` changes it.
+"""
+import json
+import typing as t
+import logging
+
+_LOG = logging.getLogger("lavaplay.jsonlib")
+
+BACKENDS = ("orjson", "msgspec", "ujson", "json")
+
+backend: str = "json"
+"""The name of the json backend in use."""
+
+loads: t.Callable[[t.Union[str, bytes]], t.Any] = json.loads
+"""Decode json from :class:`str` or :class:`bytes`."""
+
+dumps: t.Callable[[t.Any], str] = json.dumps
+"""Encode an object to a json :class:`str`."""
+
+
+def _load(name: str) -> t.Tuple[t.Callable, t.Callable]:
+    if name == "orjson":
+        import orjson
+        return orjson.loads, lambda obj: orjson.dumps(obj).decode()
+    if name == "msgspec":
+        import msgspec
+        return msgspec.json.decode, lambda obj: msgspec.json.encode(obj).decode()
+    if name == "ujson":
+        import ujson
+        return ujson.loads, ujson.dumps
+    if name == "json":
+        return json.loads, json.dumps
+    raise ValueError(f"Unknown json backend {name}, must be one of {', '.join(BACKENDS)}")
+
+
+def use(name: t.Optional[str] = None) -> str:
+    """
+    Set the json backend.
+
+    Parameters
+    ---------
+    name: :class:`str` | :class:`None`
+        one of ``orjson``, ``msgspec``, ``ujson`` or ``json``, ``None`` picks the fastest installed backend.
+
+    Raises
+    --------
+    :exc:`ImportError`
+        if the backend is not installed.
+    """
+    global backend, loads, dumps
+    if name is None:
+        for candidate in BACKENDS:
+            try:
+                loads, dumps = _load(candidate)
+            except ImportError:
+                continue
+            backend = candidate
+            break
+    else:
+        loads, dumps = _load(name)
+        backend = name
+    _LOG.debug(f"Using {backend} json backend")
+    return backend
+
+
+use()
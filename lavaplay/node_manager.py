@@ -1,10 +1,14 @@
 import asyncio
+import os
 import typing as t
-from .exceptions import TrackLoadFailed
+from .exceptions import TrackLoadFailed, TrackDecodeError
+from .codec import decode_track
 from .emitter import Emitter
 from .ws import WS
 from .rest import RestApi
-from .objects import Stats, Track, ConnectionInfo, PlayList, Info
+from .cache import CacheBackend
+from .queue_store import QueueStore
+from .objects import Stats, Track, LazyTrack, ConnectionInfo, PlayList, Info
 from .events import Event
 from . import __version__
 from .utlits import get_event_loop, prossing_tracks , prossing_single_track
@@ -31,6 +35,62 @@ class Node:
         The count shards for websocket
     is_ssl: :class:`bool`
         Is server using ssl
+    resume_key: :class:`str` | :class:`None`
+        The session id of a previous session to resume, saved from :attr:`session_id`.
+        setting it enables resuming.
+    resume_timeout: :class:`int`
+        How many seconds lavalink keeps the players of a disconnected session for resuming.
+    resuming: :class:`bool`
+        Ask lavalink to keep the players for ``resume_timeout`` seconds when the connection is lost,
+        the session is resumed on the next connection and the players are restored from lavalink.
+    resume_file: :class:`str` | :class:`None`
+        A file path to save the session id on every ready and to read it on start, so a restarted bot resumes
+        the session. setting it enables resuming.
+    track_cache: :class:`CacheBackend` | :class:`None`
+        The cache for load tracks results used by the search methods and :meth:`get_tracks`,
+        like :class:`MemoryCache`. default is no cache.
+    queue_store: :class:`QueueStore` | :class:`None`
+        The store of the player queues, like :class:`SQLiteQueueStore`. the queue of a guild is restored
+        when its player is created. default is no store.
+    prefetch: :class:`int`
+        The count of upcoming queue entries the players keep ready, the next track is sent as soon as the
+        playing track ends, before the event listeners run. ``0`` disables it, see :attr:`Player.gap_stats`.
+    resolve_concurrency: :class:`int`
+        The max :class:`LazyTrack` entries loaded at the same time for all the players of the node.
+    name: :class:`str` | :class:`None`
+        The name for the node.
+    region: :class:`str` | :class:`None`
+        The region of the node, used by :class:`RegionStrategy`.
+    rest_pool_size: :class:`int`
+        The max number of pooled REST connections to the node.
+    rest_keepalive_timeout: :class:`float`
+        How many seconds an idle REST connection stays open for reuse.
+    rest_dns_cache_ttl: :class:`int`
+        How many seconds the node address is cached after resolving.
+    rest_max_in_flight: :class:`int` | :class:`None`
+        The max REST requests running at the same time to the node, the others wait by priority, player
+        control first, then loading tracks and last the stats. default is ``rest_pool_size``.
+    reconnect_attempts: :class:`int` | :class:`None`
+        The max reconnect attempts in a row for the websocket, ``None`` retries forever.
+    reconnect_backoff: :class:`float`
+        The first reconnect delay in seconds, doubled after every failed attempt with a random jitter.
+    reconnect_backoff_max: :class:`float`
+        The max reconnect delay in seconds.
+    event_workers: :class:`int` | :class:`None`
+        The count of workers calling the event listeners, ``None`` makes a task for every listener call.
+    event_queue_size: :class:`int`
+        The max queued events by event name when ``event_workers`` is set.
+    event_overflow: :class:`str` | :class:`dict`
+        The policy for a full event queue, ``drop_oldest``, ``block`` or ``coalesce``,
+        or a dict of policies by event name with ``default`` for the other events.
+        default drops the oldest player updates and blocks the other events, the websocket stops
+        reading while ``max_pending_frames`` frames are waiting.
+    max_pending_frames: :class:`int`
+        The max websocket frames read and not handled yet.
+    player_update_interval: :class:`float` | :class:`None`
+        Coalesce the player updates, a guild gets at most one :class:`PlayerUpdateEvent` every interval
+        in milliseconds and :class:`PlayerUpdateBatchEvent` is called with the updated guilds.
+        ``None`` dispatches every update as received.
     """
     def __init__(
         self,
@@ -44,6 +104,26 @@ class Node:
         shards_count: int = 1,
         ssl: bool = False,
         loop: t.Optional[asyncio.AbstractEventLoop] = None,
+        name: t.Optional[str] = None,
+        region: t.Optional[str] = None,
+        rest_pool_size: int = 100,
+        rest_keepalive_timeout: float = 30,
+        rest_dns_cache_ttl: int = 300,
+        rest_max_in_flight: t.Optional[int] = None,
+        reconnect_attempts: t.Optional[int] = None,
+        reconnect_backoff: float = 1.0,
+        reconnect_backoff_max: float = 60.0,
+        resuming: bool = False,
+        resume_file: t.Optional[str] = None,
+        track_cache: t.Optional[CacheBackend] = None,
+        queue_store: t.Optional[QueueStore] = None,
+        prefetch: int = 0,
+        resolve_concurrency: int = 4,
+        event_workers: t.Optional[int] = None,
+        event_queue_size: int = 1000,
+        event_overflow: t.Union[str, t.Dict[str, str]] = "block",
+        max_pending_frames: int = 1000,
+        player_update_interval: t.Optional[float] = None,
         **kwargs
     ) -> None:
         self.host = host
@@ -52,22 +132,97 @@ class Node:
         self.user_id = user_id
         self.shards_count = shards_count
         self.ssl = ssl
+        self.name = name or f"{host}:{port}"
+        self.region = region
+        self.track_cache = track_cache
+        self.queue_store = queue_store
+        self.prefetch = prefetch
+        self.resolve_concurrency = resolve_concurrency
+        self._resolve_slots: t.Optional[asyncio.Semaphore] = None
         
         self.loop = loop or get_event_loop()
-        self.event_manager = Emitter(self.loop)
+        if isinstance(event_overflow, dict):
+            event_overflow = dict(event_overflow)
+            overflow = event_overflow.pop("default", "block")
+        else:
+            overflow, event_overflow = event_overflow, None
+        self.event_manager = Emitter(
+            self.loop,
+            max_workers=event_workers,
+            max_queue=event_queue_size,
+            overflow=overflow,
+            overflow_by_event=event_overflow
+        )
         self._ws: t.Optional[WS] = None
         self._resume_key = resume_key
         self._resume_timeout = resume_timeout
+        self._resume_file = resume_file
+        self.resuming = resuming or resume_key is not None or resume_file is not None
+        self._ws_options = {
+            "reconnect_attempts": reconnect_attempts,
+            "reconnect_backoff": reconnect_backoff,
+            "reconnect_backoff_max": reconnect_backoff_max,
+            "player_update_interval": player_update_interval,
+            "max_pending_frames": max_pending_frames,
+        }
 
         # Unique identifier for the client.
-        self.rest = RestApi(host=self.host, port=self.port, password=self.password, ssl=self.ssl)
+        self.rest = RestApi(
+            host=self.host,
+            port=self.port,
+            password=self.password,
+            ssl=self.ssl,
+            pool_size=rest_pool_size,
+            keepalive_timeout=rest_keepalive_timeout,
+            dns_cache_ttl=rest_dns_cache_ttl,
+            max_in_flight=rest_max_in_flight
+        )
         self.stats: Stats = None
         self._voice_handlers: t.Dict[int, ConnectionInfo] = {}
 
         self.session_id: t.Optional[str] = None
 
         self.players: t.Dict[int, Player] = {}
+        # guilds moved away without destroying their player, see :meth:`Player.move_to`
+        self._moved_players: t.Set[int] = set()
     
+    @property
+    def resume_session_id(self) -> t.Optional[str]:
+        """
+        The session id sent to lavalink to resume on the next connection, ``None`` if resuming is disabled.
+        """
+        if not self.resuming:
+            return None
+        if self.session_id:
+            return self.session_id
+        if self._resume_key:
+            return self._resume_key
+        if self._resume_file and os.path.isfile(self._resume_file):
+            with open(self._resume_file) as file:
+                return file.read().strip() or None
+        return None
+
+    def _save_session(self) -> None:
+        if self._resume_file and self.session_id:
+            with open(self._resume_file, "w") as file:
+                file.write(self.session_id)
+
+    async def _restore_players(self) -> None:
+        """
+        Rebuild the players of a resumed session from lavalink.
+        """
+        players = await self.rest.get_players(self.session_id)
+        for data in players:
+            guild_id = int(data["guildId"])
+            if guild_id in self._moved_players:
+                # the player was moved to another node while this node was away
+                await self.rest.destroy_player(self.session_id, guild_id)
+                continue
+            player = self.players.get(guild_id) or self.create_player(guild_id)
+            player._restore(data)
+        self._moved_players.clear()
+        _LOG.info(f"Restored {len(self.players)} players from the resumed session")
+
     def set_event_loop(self, loop: asyncio.AbstractEventLoop) -> None:
         """
         Set the event loop for the client requird set after call :meth:`connect`,
@@ -83,7 +238,8 @@ class Node:
 
     def create_player(self, guild_id: int) -> Player:
         """
-        Create a player for guild id.
+        Create a player for guild id, the saved queue of the guild is restored in the background
+        if the node has a queue store, see :meth:`Player.restore_queue`.
 
         Parameters
         ---------
@@ -92,6 +248,7 @@ class Node:
         """
         player = Player(self, guild_id)
         self.players[guild_id] = player
+        player._start_restore_queue()
         return player
     
     def destroy_player(self, guild_id: int) -> None:
@@ -135,6 +292,52 @@ class Node:
         """
         self.players[guild_id] = player
 
+    async def _load_tracks(self, identifier: str) -> dict:
+        if self.track_cache is None:
+            return await self.rest.load_tracks(identifier)
+        result = await self.track_cache.get(identifier)
+        if result is not None:
+            return result
+        result = await self.rest.load_tracks(identifier)
+        # errors and empty results are not cached, they may be temporary
+        if result["loadType"] in ("track", "playlist", "search"):
+            await self.track_cache.set(identifier, result)
+        return result
+
+    async def resolve_track(self, entry: LazyTrack) -> t.Optional[Track]:
+        """
+        Load the track of a lazy queue entry, the first result of a search or the selected track of a playlist.
+        return ``None`` if nothing is found or the track could not be loaded.
+
+        Parameters
+        ---------
+        entry: :class:`LazyTrack`
+            the entry to load
+        """
+        if self._resolve_slots is None:
+            self._resolve_slots = asyncio.Semaphore(self.resolve_concurrency)
+        try:
+            async with self._resolve_slots:
+                result = await self._load_tracks(entry.identifier)
+        except Exception:
+            # the entry is skipped, an error here would leave the queue stuck on it
+            _LOG.exception(f"Could not load {entry.identifier}")
+            return None
+        load_type, data = result["loadType"], result["data"]
+        if load_type == "track":
+            track = prossing_single_track(data, result)[0]
+        elif load_type == "search" and data:
+            track = prossing_tracks(data[:1], result)[0]
+        elif load_type == "playlist" and data["tracks"]:
+            selected = data["info"].get("selectedTrack", -1)
+            track = prossing_tracks([data["tracks"][max(selected, 0)]], result)[0]
+        else:
+            if load_type == "error":
+                _LOG.warning(f"Could not load {entry.identifier}: {data['message']}")
+            return None
+        track.requester = entry.requester
+        return track
+
     async def search_youtube(self, query: str) -> t.Optional[t.Union[t.List[Track], TrackLoadFailed]]:
         """
         Search for tracks with youtube.
@@ -149,7 +352,7 @@ class Node:
         :class:`lavaplayer.exceptions.TrackLoadFailed`
             If the track could not be loaded.
         """
-        result = await self.rest.load_tracks(f"ytsearch:{query}")
+        result = await self._load_tracks(f"ytsearch:{query}")
         res = result["data"]
         if result["loadType"] == "empty":
             return []
@@ -171,7 +374,7 @@ class Node:
         :class:`lavaplayer.exceptions.TrackLoadFailed`
             If the track could not be loaded.
         """
-        result = await self.rest.load_tracks(f"scsearch:{query}")
+        result = await self._load_tracks(f"scsearch:{query}")
         res = result["data"]
         if result["loadType"] == "empty":
             return []
@@ -193,7 +396,7 @@ class Node:
         :class:`lavaplayer.exceptions.TrackLoadFailed`
             If the track could not be loaded.
         """
-        result = await self.rest.load_tracks(f"ytmsearch:{query}")
+        result = await self._load_tracks(f"ytmsearch:{query}")
         res = result["data"]
         if result["loadType"] == "empty":
             return []
@@ -215,7 +418,7 @@ class Node:
         :class:`lavaplayer.exceptions.TrackLoadFailed`
             If the track could not be loaded.
         """
-        result = await self.rest.load_tracks(query)
+        result = await self._load_tracks(query)
         res = result["data"]
 
         if result["loadType"] == "playlist":
@@ -231,7 +434,7 @@ class Node:
 
 
 
-    async def decodetrack(self, track: str) -> Track:
+    async def decodetrack(self, track: str, local: bool = True) -> Track:
         """
         This method is used to decode a track from base64 only server can resolve, to info can anyone understanding it
 
@@ -239,27 +442,19 @@ class Node:
         ---------
         track: :class:`str`
             track result from base64
-        """
+        local: :class:`bool`
+            decode the track in process without a request, the node is only asked
+            for unknown track versions. the plugin info is only returned by the node.
+        """
+        if local:
+            try:
+                return decode_track(track)
+            except TrackDecodeError as error:
+                _LOG.debug(f"Could not decode track locally, asking the node: {error}")
         result = await self.rest.decode_track(track)
-        info = result["info"]
-        return Track(
-            track,
-            identifier=info["identifier"],
-            is_seekable=info["isSeekable"],
-            author=info["author"],
-            length=info["length"],
-            is_stream=info["isStream"],
-            position=info["position"],
-            source_name=info.get("sourceName", None),
-            title=info.get("title", None),
-            uri=info["uri"],
-            artworkUrl=info.get("artworkUrl", None),
-            isrc=info.get("isrc", None),
-            load_type=result.get("loadType", None),
-            plugin_info=track["pluginInfo"]
-        )
+        return prossing_single_track(result, result)[0]
 
-    async def decodetracks(self, tracks: t.List[t.Dict]) -> t.List[Track]:
+    async def decodetracks(self, tracks: t.List[str], local: bool = True) -> t.List[Track]:
         """
         This method is used to decode a tracks from base64 only server can resolve, to info can anyone understanding it
 
@@ -267,9 +462,26 @@ class Node:
         ---------
         tracks: :class:`list`
             tracks result from base64
-        """
-        result = await self.rest.decode_tracks(tracks)
-        return prossing_tracks(result,result)
+        local: :class:`bool`
+            decode the tracks in process without a request, the node is only asked
+            for the tracks of unknown versions. the plugin info is only returned by the node.
+        """
+        if not local:
+            result = await self.rest.decode_tracks(tracks)
+            return prossing_tracks(result, {})
+        decoded: t.List[t.Optional[Track]] = []
+        remote: t.List[int] = []
+        for index, track in enumerate(tracks):
+            try:
+                decoded.append(decode_track(track))
+            except TrackDecodeError:
+                decoded.append(None)
+                remote.append(index)
+        if remote:
+            result = await self.rest.decode_tracks([tracks[index] for index in remote])
+            for index, track in zip(remote, prossing_tracks(result, {})):
+                decoded[index] = track
+        return decoded
 
     async def auto_search_tracks(self, query: str) -> t.Union[t.Optional[t.List[Track]], t.Optional[PlayList]]:
         """
@@ -334,12 +546,16 @@ class Node:
             ssl=self.ssl, 
             password=self.password, 
             user_id=self.user_id,
-            shards_count=self.shards_count
+            shards_count=self.shards_count,
+            **self._ws_options
         )
         asyncio.ensure_future(self._ws._connect(), loop=self.loop)
 
     async def close(self):
         """
-        Disconnect from the lavalink websocket
+        Disconnect from the lavalink websocket and close the REST session.
         """
-        await self._ws.ws.close()
+        if self._ws:
+            await self._ws.close()
+        await self.rest.close()
+        await self.event_manager.close()
@@ -1,14 +1,37 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from .exceptions import FiltersError
 import typing as t
 from inspect import signature
+from types import MappingProxyType
+
+EMPTY_PLUGIN_INFO: t.Mapping[str, t.Any] = MappingProxyType({})
+"""The read-only ``plugin_info`` shared by all the tracks without plugin info."""
 
 # https://stackoverflow.com/questions/55099243/python3-dataclass-with-kwargsasterisk
 class BaseObject:
+    # empty slots keep a ``__dict__`` off subclasses declared with :func:`slotted`
+    __slots__ = ()
+
+    extras: t.ClassVar[t.Optional[dict]] = None
+    """The payload keys unknown by the object, set by :mod:`lavaplay.schemas` decoders."""
+
+    @classmethod
+    def _fields(cls) -> t.FrozenSet[str]:
+        # the constructor's signature is fetched once and cached on the class itself,
+        # looked up in ``cls.__dict__`` so subclasses never reuse their parent's fields.
+        fields = cls.__dict__.get("_cls_fields")
+        if fields is None:
+            fields = frozenset(signature(cls).parameters)
+            setattr(cls, "_cls_fields", fields)
+        return fields
+
     @classmethod
     def from_kwargs(cls, **kwargs):
-        # fetch the constructor's signature
-        cls_fields = {field for field in signature(cls).parameters}
+        cls_fields = cls._fields()
+
+        # fast path, the payload has no unknown keys
+        if cls_fields.issuperset(kwargs):
+            return cls(**kwargs)
 
         # split the kwargs into native ones and new ones
         native_args, new_args = {}, {}
@@ -26,6 +49,22 @@ class BaseObject:
             setattr(ret, new_name, new_val)
         return ret
 
+
+def slotted(cls):
+    """
+    Rebuild a dataclass with ``__slots__`` so its instances have no ``__dict__``,
+    same as ``dataclass(slots=True)`` which needs python 3.10 or newer.
+    """
+    field_names = tuple(field.name for field in fields(cls))
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = field_names
+    for name in field_names:
+        # defaults are kept by the generated ``__init__``, the class attributes would shadow the slots
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
 @dataclass
 class Memory(BaseObject):
     free: int
@@ -58,10 +97,15 @@ class Stats(BaseObject):
     frameStats: t.Optional[FrameStats] = None
 
 
+@slotted
 @dataclass(repr=True)
 class Track(BaseObject):
     """
     Info track object.
+
+    The track is slotted to keep big queues and playlists small in memory,
+    so attributes other than the fields below can't be set on it. the tracks without
+    plugin info share :data:`EMPTY_PLUGIN_INFO`, which can't be changed.
     """
     encoded: str
     identifier: str
@@ -86,6 +130,53 @@ class Track(BaseObject):
     def __repr__(self) -> str:
         return self.title
 
+
+@slotted
+@dataclass(repr=True)
+class LazyTrack(BaseObject):
+    """
+    A queue entry loaded with the node only when it reaches the head of the queue or the prefetch window,
+    so a big list is queued without a request for every entry. entries that load nothing are skipped.
+
+    >>> await player.play_tracks([LazyTrack(name) for name in names])
+
+    Parameters
+    ---------
+    query: :class:`str`
+        a url, or words to search with ``search``.
+    search: :class:`str` | :class:`None`
+        the search prefix for words like ``ytsearch`` or ``scsearch``, ``None`` loads the query as it is.
+    title: :class:`str` | :class:`None`
+        the title to show before the track is loaded
+    author: :class:`str` | :class:`None`
+        the author to show before the track is loaded
+    length: :class:`int` | :class:`None`
+        the length in milliseconds to show before the track is loaded
+    """
+    query: str
+    search: t.Optional[str] = "ytsearch"
+    title: t.Optional[str] = None
+    author: t.Optional[str] = None
+    length: t.Optional[int] = None
+    requester: t.Optional[int] = None
+    position: int = 0
+
+    # a lazy entry has no blob until it is loaded
+    encoded: t.ClassVar[None] = None
+    is_stream: t.ClassVar[bool] = False
+
+    @property
+    def identifier(self) -> str:
+        """
+        The identifier to load with the node.
+        """
+        if self.search is None or self.query.startswith(("http://", "https://")):
+            return self.query
+        return f"{self.search}:{self.query}"
+
+    def __repr__(self) -> str:
+        return self.title or self.query
+
 @dataclass
 class ConnectionInfo(BaseObject):
     """
@@ -1,16 +1,52 @@
 import typing as t
 import asyncio
-from .objects import Track, Filters, ConnectionInfo, PlayList, VoiceInfo
-from .exceptions import VolumeError
 import random
+import time
+import contextvars
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from .objects import Track, LazyTrack, Filters, ConnectionInfo, PlayList, VoiceInfo
+from .exceptions import VolumeError, TrackDecodeError
+from .codec import decode_track
+from .queue import Queue
+from .queue_store import LAZY_PREFIX
+from .utlits import event_track
 import logging
 if t.TYPE_CHECKING:
     from .node_manager import Node
+    from .queue_store import QueueStore
 
 _LOG = logging.getLogger("lavaplay.player")
 
+# the batches of the running context, player -> the task that opened the batch and its merged update
+_BATCHES: "contextvars.ContextVar[t.Mapping[Player, t.Tuple[asyncio.Task, dict]]]" = contextvars.ContextVar(
+    "lavaplay_batches", default={}
+)
+
+
+@dataclass
+class GapStats:
+    """
+    The silence between the end of a track and the start of the next queued track, in milliseconds.
+    """
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    last: float = 0.0
+
+    @property
+    def average(self) -> float:
+        """
+        The average gap in milliseconds.
+        """
+        return self.total / self.count if self.count else 0.0
+
 
 class Player:
+    # the clock used to interpolate the position, can be replaced by a fake clock
+    _clock: t.Callable[[], float] = staticmethod(time.monotonic)
+
     def __init__(self, node: "Node", guild_id: int) -> None:
         self.guild_id = guild_id
         self.node = node
@@ -21,18 +57,301 @@ class Player:
         self._voice_info: t.Dict[int, VoiceInfo] = {}
 
         self._volume: int = 100
-        self._filters: Filters = Filters()
-        self.queue: t.List[Track] = []
+        self._paused: bool = False
+        self._filters: t.Optional[Filters] = None
+        self._queue: Queue = Queue()
         self.loop: asyncio.AbstractEventLoop = node.loop
 
         self._repeat = False
         self._queue_repeat = False
         self._is_connected = False
         self._ping = 0
+        # the last known position in milliseconds, the clock time it was known and the lavalink time of the state
+        self._position: float = 0
+        self._position_at: t.Optional[float] = None
+        self._state_time: int = 0
+        # the queue changes not written to the store yet, written in order by one task
+        self.queue_store: t.Optional["QueueStore"] = node.queue_store
+        self._store_ops: t.Deque[t.Tuple[str, tuple]] = deque()
+        self._store_task: t.Optional[asyncio.Task] = None
+        self._queue_restored: t.Optional[asyncio.Future] = None
+        # the count of upcoming tracks kept ready, 0 disables prefetching
+        self.prefetch: int = node.prefetch
+        self.gap_stats = GapStats()
+        self._ended_at: t.Optional[float] = None
+        self._prefetch_task: t.Optional[asyncio.Task] = None
+        # the next track and its update payload, ready before the playing track ends
+        self._prepared: t.Optional[t.Tuple[Track, dict]] = None
+
+    async def _update_player(self, data: dict) -> None:
+        """
+        Send a player update, or merge it to the running batch.
+        """
+        pending = self._pending_batch()
+        if pending is not None:
+            pending.update(data)
+            return
+        res = await self.rest.update_player(
+            session_id=self.node.session_id,
+            guild_id=self.guild_id,
+            data=data
+        )
+        if res and "state" in res:
+            self._is_connected = res["state"]["connected"]
+            self._ping = res["state"]["ping"]
+
+    def _pending_batch(self) -> t.Optional[dict]:
+        """
+        Return the merged update of the batch opened by the current task, None when not batching.
+        """
+        entry = _BATCHES.get().get(self)
+        # the tasks created inside a batch copy the context, they don't batch
+        if entry is None or entry[0] is not asyncio.current_task():
+            return None
+        return entry[1]
+
+    @asynccontextmanager
+    async def batch(self) -> t.AsyncIterator["Player"]:
+        """
+        Merge the player updates made inside the block to one request sent at the end of the block,
+        lavalink applies the fields of a player update together. the last value of a field is kept.
+
+        >>> async with player.batch():
+        ...     await player.volume(50)
+        ...     await player.filters(filters)
+        ...     await player.seek(30000)
+
+        Only the updates made by the task of the block are batched, a batch inside a batch is
+        merged to the outer batch. the next track of the queue and :meth:`move_to` are never batched.
+        """
+        if self._pending_batch() is not None:
+            yield self
+            return
+        data: dict = {}
+        token = _BATCHES.set({**_BATCHES.get(), self: (asyncio.current_task(), data)})
+        try:
+            yield self
+        finally:
+            _BATCHES.reset(token)
+            # the local state is already changed, so the update is sent even after an error
+            if data:
+                await self._update_player(data)
+
+    def _enqueue(self, tracks: t.Sequence[t.Union[Track, LazyTrack]], requester: t.Optional[int] = None) -> t.Optional[Track]:
+        """
+        Add tracks to the queue in one operation, return the track to start if the queue was empty.
+        """
+        if not all(track.encoded or isinstance(track, LazyTrack) for track in tracks):
+            raise ValueError("Encoded of the track is None")
+        for track in tracks:
+            track.requester = requester
+        start = not self.queue
+        self.queue.extend(tracks)
+        self._store("append", [self._store_entry(track) for track in tracks])
+        if not start:
+            self._schedule_prefetch()
+        return tracks[0] if start and tracks else None
+
+    @staticmethod
+    def _store_entry(track: t.Union[Track, LazyTrack]) -> t.Tuple[str, t.Optional[int]]:
+        if isinstance(track, LazyTrack):
+            return f"{LAZY_PREFIX}{track.identifier}", track.requester
+        return track.encoded, track.requester
+
+    def _store(self, op: str, *args: t.Any) -> None:
+        """
+        Write a queue change to the queue store in the background.
+        """
+        if self.queue_store is None:
+            return
+        self._store_ops.append((op, args))
+        if self._store_task is None:
+            self._store_task = self.loop.create_task(self._write_store())
+
+    async def _write_store(self) -> None:
+        try:
+            while self._store_ops:
+                op, args = self._store_ops.popleft()
+                try:
+                    if op == "restore":
+                        await self._restore_queue()
+                    else:
+                        await getattr(self.queue_store, op)(self.guild_id, *args)
+                except Exception:
+                    _LOG.exception(f"Failed to write the queue change {op} of guild {self.guild_id}")
+        finally:
+            self._store_task = None
+
+    async def _restore_queue(self) -> None:
+        tracks = []
+        try:
+            for encoded, requester in await self.queue_store.load(self.guild_id):
+                if encoded.startswith(LAZY_PREFIX):
+                    tracks.append(LazyTrack(encoded[len(LAZY_PREFIX):], search=None, requester=requester))
+                    continue
+                try:
+                    track = decode_track(encoded)
+                except TrackDecodeError as error:
+                    _LOG.warning(f"Skipping a saved track of guild {self.guild_id}: {error}")
+                    continue
+                track.requester = requester
+                tracks.append(track)
+        finally:
+            self._queue_restored.set_result(len(tracks))
+        if not tracks:
+            return
+        if not self.queue:
+            self._queue = Queue(tracks)
+            return
+        # tracks were added before the restore, the store is written again in full
+        current = list(self.queue)
+        if self._store_entry(current[0])[0] == self._store_entry(tracks[0])[0]:
+            # the playing track was already restored from the resumed lavalink session, keep the saved order
+            if current[0].requester is None:
+                current[0].requester = tracks[0].requester
+            self._queue = Queue([current[0], *tracks[1:], *current[1:]])
+        else:
+            self._queue = Queue([*current, *tracks])
+        # the changes made while writing are queued after the rewrite, it must not include them
+        entries = [self._store_entry(track) for track in self.queue]
+        self._store_ops.clear()
+        await self.queue_store.clear(self.guild_id)
+        await self.queue_store.append(self.guild_id, entries)
+
+    def _start_restore_queue(self) -> None:
+        if self.queue_store is None or self._queue_restored is not None:
+            return
+        self._queue_restored = self.loop.create_future()
+        # the first operation, the queue changes made before the restore are written after it
+        self._store_ops.appendleft(("restore", ()))
+        if self._store_task is None:
+            self._store_task = self.loop.create_task(self._write_store())
+
+    async def restore_queue(self) -> int:
+        """
+        Wait for the queue saved in the node queue store to be restored, the restore is started
+        by :meth:`Node.create_player`. Return the count of restored tracks.
+
+        Await it before adding tracks, tracks added before the restore stay first in the queue.
+        """
+        if self._queue_restored is None:
+            self._start_restore_queue()
+            if self._queue_restored is None:
+                return 0
+        return await asyncio.shield(self._queue_restored)
+
+    def _track_payload(self, track: Track) -> dict:
+        prepared = self._prepared
+        if prepared is not None and prepared[0] is track:
+            return prepared[1]
+        return {"track": {"encoded": track.encoded}}
+
+    def _next_track(self) -> t.Optional[Track]:
+        """
+        The track to play when the playing track ends.
+        """
+        if not self.queue:
+            return None
+        if self._repeat:
+            return self.queue[0]
+        if len(self.queue) > 1:
+            return self.queue[1]
+        return self.queue[0] if self._queue_repeat else None
+
+    def _schedule_prefetch(self) -> None:
+        if self.prefetch <= 0 or self._prefetch_task is not None:
+            return
+        self._prefetch_task = self.loop.create_task(self._prefetch())
+
+    async def _prefetch(self) -> None:
+        try:
+            # the upcoming tracks after the playing track, by the queue order
+            index = 1
+            while index <= self.prefetch and index < len(self.queue):
+                if await self._resolve_entry(index):
+                    index += 1
+            track = self._next_track()
+            self._prepared = (track, {"track": {"encoded": track.encoded}}) if track is not None and track.encoded else None
+        except Exception:
+            _LOG.exception(f"Failed to prefetch the queue of guild {self.guild_id}")
+        finally:
+            self._prefetch_task = None
+
+    async def _resolve_entry(self, index: int) -> bool:
+        """
+        Make the queue entry at index ready to play, return ``False`` if the entry was removed.
+        """
+        entry = self.queue[index]
+        if not isinstance(entry, LazyTrack):
+            return True
+        track = await self.node.resolve_track(entry)
+        # the queue can change while loading, the entry is looked up again
+        for position, current in enumerate(self.queue):
+            if current is entry:
+                break
+        else:
+            return True
+        if track is not None:
+            self.queue[position] = track
+            return True
+        del self.queue[position]
+        self._store("remove", position)
+        return False
+
+    async def _resolve_head(self) -> t.Optional[Track]:
+        """
+        Load the lazy entries at the head of the queue, entries that load nothing are skipped.
+        """
+        while self.queue and isinstance(self.queue[0], LazyTrack):
+            await self._resolve_entry(0)
+        return self.queue[0] if self.queue else None
+
+    async def _play_next(self) -> None:
+        """
+        Play the next track after the playing track ended.
+        """
+        track = self._advance()
+        if track is None:
+            self._ended_at = None
+            return
+        self._ended_at = self._clock()
+        # the next track starts now, even when a batch of the task is open
+        token = _BATCHES.set({})
+        try:
+            await self.play(track, track.requester, True)
+        finally:
+            _BATCHES.reset(token)
+
+    def _track_started(self) -> None:
+        if self._ended_at is None:
+            return
+        gap = (self._clock() - self._ended_at) * 1000
+        self._ended_at = None
+        stats = self.gap_stats
+        stats.count += 1
+        stats.total += gap
+        stats.last = gap
+        if gap > stats.max:
+            stats.max = gap
+
+    def _advance(self) -> t.Optional[Track]:
+        """
+        Move the queue to the next track after the playing track ended, return the track to play.
+        """
+        if not self.queue:
+            return None
+        if self._queue_repeat:
+            self.queue.rotate()
+            self._store("rotate")
+        elif not self._repeat:
+            self.queue.popleft()
+            self._store("popleft")
+        return self.queue[0] if self.queue else None
 
     def add_to_queue(self, tracks: t.List[Track], requester: t.Optional[int] = None) -> None:
         """
         Add tracks to queue. use to load a playlist result.
+        if the queue was empty the first track is started in the background.
 
         >>> playlist = lavaplay.search_youtube("playlist url")
         >>> lavaplay.add_to_queue(playlist.tracks)
@@ -41,9 +360,28 @@ class Player:
         ---------
         tracks: :class:`list`
             tracks to add to queue
+        requester: :class:`int` | :class:`None`
+            user id for requester the play tracks
         """
-        for track in tracks:
-            self.loop.create_task(self.play(self.guild_id, track, requester))
+        track = self._enqueue(tracks, requester)
+        if track is not None:
+            self.loop.create_task(self.play(track, requester, True))
+
+    async def play_tracks(self, tracks: t.List[Track], requester: t.Optional[int] = None) -> None:
+        """
+        Add tracks to the queue in one operation, if the queue was empty the first track is played
+        with a single request.
+
+        Parameters
+        ---------
+        tracks: :class:`list`
+            tracks to add to queue
+        requester: :class:`int` | :class:`None`
+            user id for requester the play tracks
+        """
+        track = self._enqueue(tracks, requester)
+        if track is not None:
+            await self.play(track, requester, True)
 
     async def play(self, track: Track, requester: t.Optional[int] = None, start: bool = False) -> None:
         """
@@ -56,18 +394,22 @@ class Player:
         start: :class:`bool`
             force play queue is ignored
         """
-        if not track.encoded:
+        if not track.encoded and not isinstance(track, LazyTrack):
             raise ValueError("Encoded of the track is None")
 
-        if len(self.queue) == 0 or start:
-            await self.rest.update_player(
-                session_id=self.node.session_id,
-                guild_id=self.guild_id,
-                data={"track": {"encoded": track.encoded}}
-            )
-        if not start:
-            track.requester = requester
-            self.queue.append(track)
+        # the queue is updated before the request, so concurrent calls see the track queued
+        if not start and self._enqueue((track,), requester) is None:
+            return
+        if isinstance(track, LazyTrack):
+            if self.queue and self.queue[0] is track:
+                track = await self._resolve_head()
+            else:
+                track = await self.node.resolve_track(track)
+            if track is None:
+                return
+        await self._update_player(self._track_payload(track))
+        self._set_position(0)
+        self._schedule_prefetch()
 
     async def play_playlist(self, playlist: PlayList, requester: t.Optional[int] = None) -> None:
         """
@@ -80,8 +422,7 @@ class Player:
         requester: :class:`int` | :class:`None`
             user id for requester the play track
         """
-        for track in playlist.tracks:
-            await self.play(track, requester)
+        await self.play_tracks(playlist.tracks, requester)
 
     def repeat(self, stats: bool) -> None:
         """
@@ -118,13 +459,10 @@ class Player:
         if not filters:
             filters = Filters()
         filters._payload["guildId"] = str(self.guild_id)
-        await self.rest.update_player(
-            session_id=self.node.session_id,
-            guild_id=self.guild_id,
-            data={
-                "filters": filters._payload
-            }
-        )
+        # the position until now is at the old speed
+        self._set_position(self.position)
+        self._filters = filters
+        await self._update_player({"filters": filters._payload})
 
     async def stop(self) -> None:
         """
@@ -133,11 +471,9 @@ class Player:
         if len(self.queue) == 0:
             return
         self.queue.clear()
-        await self.rest.update_player(
-            session_id=self.node.session_id,
-            guild_id=self.guild_id,
-            data={"track": {"encoded": None}}
-        )
+        self._store("clear")
+        self._set_position(0, anchored=False)
+        await self._update_player({"track": {"encoded": None}})
 
     async def skip(self) -> None:
         """
@@ -145,11 +481,7 @@ class Player:
         """        
         if len(self.queue) == 0:
             return
-        await self.rest.update_player(
-            session_id=self.node.session_id,
-            guild_id=self.guild_id,
-            data={"track": {"encoded": None}}
-        )
+        await self._update_player({"track": {"encoded": None}})
 
     async def pause(self, stats: bool) -> None:
         """
@@ -160,13 +492,9 @@ class Player:
         stats: :class:`bool`
             the stats for repeat track
         """        
-        await self.rest.update_player(
-            session_id=self.node.session_id,
-            guild_id=self.guild_id,
-            data={
-                "paused": stats
-            }
-        )
+        self._set_position(self.position)
+        self._paused = stats
+        await self._update_player({"paused": stats})
 
     async def seek(self, position: int) -> None:
         """
@@ -177,13 +505,8 @@ class Player:
         position: :class:`int`
             the position is in milliseconds
         """        
-        await self.rest.update_player(
-            session_id=self.node.session_id,
-            guild_id=self.guild_id,
-            data={
-                "position": position
-            }
-        )
+        await self._update_player({"position": position})
+        self._set_position(position)
 
     async def volume(self, volume: int) -> None:
         """
@@ -202,13 +525,7 @@ class Player:
         if volume < 0 or volume > 1000:
             raise VolumeError("Volume may range from 0 to 1000. 100 is default", self.guild_id)        
         self._volume = volume
-        await self.rest.update_player(
-            session_id=self.node.session_id,
-            guild_id=self.guild_id,
-            data={
-                "volume": volume
-            }
-        )
+        await self._update_player({"volume": volume})
 
     async def destroy(self) -> None:
         """
@@ -226,22 +543,20 @@ class Player:
         """        
         await self.rest.destroy_player(self.node.session_id, self.guild_id)
 
-    def shuffle(self, state: bool = True) -> t.List[Track]:
+    def shuffle(self, state: bool = True) -> Queue:
         """
-        Add shuffle to the track.
+        Add shuffle to the track, the playing track keeps its position.
 
         Parameters
         ---------
         state: :class:`bool`
             the stats for shuffle track (unused)
         """        
-        if not self.queue:
-            return []
         self._shuffle = state  # unused
-        np = self.queue[0]
-        self.queue.remove(np)
-        self.queue = random.sample(self.queue, len(self.queue))
-        self.queue.insert(0, np)
+        seed = random.getrandbits(32)
+        self.queue.shuffle(start=1, seed=seed)
+        self._store("shuffle", 1, seed)
+        self._schedule_prefetch()
         return self.queue
 
     def remove(self, position: int) -> None:
@@ -255,7 +570,11 @@ class Player:
         """        
         if not self.queue:
             return
-        self.queue.pop(position)
+        if position < 0:
+            position += len(self.queue)
+        del self.queue[position]
+        self._store("remove", position)
+        self._schedule_prefetch()
 
     def index(self, position: int) -> t.Union[Track, None]:
         """
@@ -268,7 +587,7 @@ class Player:
         """        
         if not self.queue:
             return None
-        elif position > len(self.queue):
+        elif position >= len(self.queue):
             return None
         return self.queue[position]
 
@@ -290,17 +609,122 @@ class Player:
         if not channel_id:
             await self.destroy()
             return
+        await self._update_player({"voice": self._voice_payload(session_id, token, endpoint, channel_id)})
+
+    def _restore(self, data: dict) -> None:
+        """
+        Restore the player state from a lavalink player payload of a resumed session.
+        """
+        self._volume = data["volume"]
+        self._paused = data["paused"]
+        self._is_connected = data["state"]["connected"]
+        self._ping = data["state"]["ping"]
+        if data.get("filters"):
+            self._filters = Filters()
+            self._filters._payload.update(data["filters"])
+        voice = data.get("voice") or {}
+        if voice.get("sessionId") and voice.get("channelId"):
+            self._voice_handlers[self.guild_id] = ConnectionInfo(self.guild_id, voice["sessionId"], int(voice["channelId"]))
+            self._voice_info[self.guild_id] = VoiceInfo(voice["token"], voice["endpoint"])
+        track = data.get("track")
+        if track and not self.queue:
+            self.queue.extend(event_track(track))
+            # same unit as the player updates, seconds
+            self.queue[0].position = data["state"].get("position", 0) / 1000
+        self._update_state(data["state"].get("position", 0), data["state"].get("time", 0))
+
+    def _update_state(self, position: int, state_time: int) -> None:
+        """
+        Save the position of a lavalink player state, states older than the last one are ignored.
+        """
+        if state_time < self._state_time:
+            return
+        self._state_time = state_time
+        self._set_position(position)
+
+    def _set_position(self, position: float, anchored: bool = True) -> None:
+        self._position = position
+        self._position_at = self._clock() if anchored else None
+
+    @property
+    def speed(self) -> float:
+        """
+        Return the playback speed from the timescale filter, ``speed * rate``.
+        """
+        timescale = self._filters._payload.get("timescale") if self._filters is not None else None
+        if not timescale:
+            return 1.0
+        return timescale.get("speed", 1.0) * timescale.get("rate", 1.0)
+
+    @property
+    def position(self) -> int:
+        """
+        Return the position of the playing track in milliseconds.
+
+        The position is interpolated from the last player update, so reading it makes no request.
+        """
+        if not self.queue:
+            return 0
+        position = self._position
+        if self._position_at is not None and not self._paused:
+            position += (self._clock() - self._position_at) * 1000 * self.speed
+        track = self.queue[0]
+        if not track.is_stream and track.length:
+            position = min(position, track.length)
+        return int(position)
+
+    @staticmethod
+    def _voice_payload(session_id: str, token: str, endpoint: str, channel_id: int) -> dict:
+        return {
+            "token": token,
+            "sessionId": session_id,
+            "endpoint": endpoint.replace("wss://", ""),
+            "channelId": str(channel_id)
+        }
+
+    async def move_to(self, node: "Node", destroy: bool = True) -> None:
+        """
+        Move the player to another node, the voice connection, current track, position,
+        volume, pause state and filters are sent to the new node in one request.
+
+        Parameters
+        ---------
+        node: :class:`Node`
+            the node to move the player to, must be connected.
+        destroy: :class:`bool`
+            destroy the player on the old node first, disable it when the old node is not reachable.
+        """
+        old_node = self.node
+        if node is old_node:
+            return
+        if destroy:
+            await self.destroy()
+        else:
+            old_node._moved_players.add(self.guild_id)
+        old_node.players.pop(self.guild_id, None)
+        self.node = node
+        self.rest = node.rest
+        self.loop = node.loop
+        node.players[self.guild_id] = self
+        # the states of the new node have its own times
+        self._state_time = 0
+
+        data = {"volume": self._volume, "paused": self._paused}
+        if self._filters is not None:
+            data["filters"] = self._filters._payload
+        connection_info = self._voice_handlers.get(self.guild_id)
+        voice_info = self._voice_info.get(self.guild_id)
+        if connection_info and voice_info:
+            data["voice"] = self._voice_payload(connection_info.session_id, voice_info.token, voice_info.endpoint, connection_info.channel_id)
+        if self.queue:
+            data["track"] = {"encoded": self.queue[0].encoded}
+            data["position"] = self.position
+        _LOG.info(f"Moving player {self.guild_id} from node {old_node.name} to node {node.name}")
+        # sent now even inside a batch, the new node has no player until this request
         res = await self.rest.update_player(
-            session_id=self.node.session_id,
+            session_id=node.session_id,
             guild_id=self.guild_id,
-            data={
-                "voice": {
-                    "token": token,
-                    "sessionId": session_id,
-                    "endpoint": endpoint.replace("wss://", ""),
-                    "channelId": str(channel_id)
-                }
-            }
+            data=data
         )
         self._is_connected = res["state"]["connected"]
         self._ping = res["state"]["ping"]
@@ -343,6 +767,19 @@ class Player:
         await self.voice_update(connection_info.session_id, token, endpoint, connection_info.channel_id)
 
 
+    @property
+    def queue(self) -> Queue:
+        """
+        Return the tracks queue, the first track is the playing track.
+        """
+        return self._queue
+
+    @queue.setter
+    def queue(self, tracks: t.Iterable[Track]) -> None:
+        self._queue = tracks if isinstance(tracks, Queue) else Queue(tracks)
+        self._store("clear")
+        self._store("append", [self._store_entry(track) for track in self._queue])
+
     @property
     def is_connected(self) -> bool:
         """
@@ -364,6 +801,13 @@ class Player:
         """
         return len(self.queue) > 0
 
+    @property
+    def is_paused(self) -> bool:
+        """
+        Return if the player is paused.
+        """
+        return self._paused
+
     @property
     def is_repeat(self) -> bool:
         """
@@ -0,0 +1,197 @@
+import random
+import typing as t
+from collections.abc import MutableSequence
+from .objects import Track
+
+
+def shuffle_range(items: t.MutableSequence[t.Any], first: int, rng: t.Any = random) -> None:
+    """
+    Shuffle in place the items from ``first`` to the end, the same seeded ``rng`` gives the same order.
+    """
+    first = max(first, 0)
+    randbelow = rng.randrange
+    for index in range(len(items) - 1, first, -1):
+        other = first + randbelow(index - first + 1)
+        items[index], items[other] = items[other], items[index]
+
+
+class Queue(MutableSequence):
+    """
+    The tracks queue of a player, the first track is the current playing track.
+
+    It is backed by a list and a head offset, advancing or rotating the queue only moves
+    the offset, and the consumed slots are released in batches. Random access by index
+    is a plain list lookup.
+
+    Parameters
+    ---------
+    tracks: :class:`list`
+        the initial tracks of the queue
+    """
+    # consumed slots are released once they are more than this and half of the backing list
+    _COMPACT_THRESHOLD = 64
+
+    def __init__(self, tracks: t.Iterable[Track] = ()) -> None:
+        self._items: t.List[Track] = list(tracks)
+        self._head = 0
+
+    def _index(self, index: int) -> int:
+        size = len(self._items) - self._head
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("queue index out of range")
+        return self._head + index
+
+    def _compact(self) -> None:
+        if self._head > self._COMPACT_THRESHOLD and self._head * 2 >= len(self._items):
+            del self._items[:self._head]
+            self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._items) - self._head
+
+    def __bool__(self) -> bool:
+        return len(self._items) > self._head
+
+    def __iter__(self) -> t.Iterator[Track]:
+        items = self._items
+        for index in range(self._head, len(items)):
+            yield items[index]
+
+    def __getitem__(self, index: t.Union[int, slice]) -> t.Union[Track, t.List[Track]]:
+        if isinstance(index, slice):
+            # the slice is mapped to the backing list, only the selected tracks are copied
+            head = self._head
+            start, stop, step = index.indices(len(self))
+            if not range(start, stop, step):
+                return []
+            if stop < 0:
+                # a reversed slice to the first track, stops before the head
+                stop = None if head == 0 else head - 1
+            else:
+                stop += head
+            return self._items[head + start:stop:step]
+        return self._items[self._index(index)]
+
+    def __setitem__(self, index: t.Union[int, slice], track: t.Union[Track, t.Iterable[Track]]) -> None:
+        if isinstance(index, slice):
+            # a slice is an index range of the backing list after dropping the consumed slots
+            self._release()
+            self._items[index] = track
+            return
+        self._items[self._index(index)] = track
+
+    def __delitem__(self, index: t.Union[int, slice]) -> None:
+        if isinstance(index, slice):
+            self._release()
+            del self._items[index]
+            return
+        if index == 0 or index == -len(self):
+            self.popleft()
+            return
+        del self._items[self._index(index)]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (Queue, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Queue({self._items[self._head:]!r})"
+
+    def _release(self) -> None:
+        if self._head:
+            del self._items[:self._head]
+            self._head = 0
+
+    def insert(self, index: int, track: Track) -> None:
+        """
+        Insert a track before the index.
+        """
+        size = len(self)
+        index = max(0, min(size, index + size if index < 0 else index))
+        if index == 0 and self._head:
+            self._head -= 1
+            self._items[self._head] = track
+            return
+        self._items.insert(self._head + index, track)
+
+    def append(self, track: Track) -> None:
+        """
+        Add a track to the end of the queue.
+        """
+        self._items.append(track)
+
+    def extend(self, tracks: t.Iterable[Track]) -> None:
+        """
+        Add many tracks to the end of the queue in one operation.
+        """
+        self._items.extend(tracks)
+
+    def popleft(self) -> Track:
+        """
+        Remove and return the first track of the queue.
+        """
+        if not self:
+            raise IndexError("pop from an empty queue")
+        track = self._items[self._head]
+        self._items[self._head] = None
+        self._head += 1
+        if self._head == len(self._items):
+            self._items.clear()
+            self._head = 0
+        else:
+            self._compact()
+        return track
+
+    def pop(self, index: int = -1) -> Track:
+        """
+        Remove and return the track at index, default is the last track.
+        """
+        if index == 0 or index == -len(self):
+            return self.popleft()
+        return self._items.pop(self._index(index))
+
+    def rotate(self) -> None:
+        """
+        Move the first track to the end of the queue.
+        """
+        if self:
+            self._items.append(self.popleft())
+
+    def copy(self) -> "Queue":
+        """
+        Return a shallow copy of the queue.
+        """
+        return Queue(self)
+
+    def sort(self, *, key: t.Optional[t.Callable[[Track], t.Any]] = None, reverse: bool = False) -> None:
+        """
+        Sort the tracks in place, same as :meth:`list.sort`.
+        """
+        self._release()
+        self._items.sort(key=key, reverse=reverse)
+
+    def clear(self) -> None:
+        """
+        Remove all tracks from the queue.
+        """
+        self._items.clear()
+        self._head = 0
+
+    def shuffle(self, start: int = 1, seed: t.Optional[int] = None) -> None:
+        """
+        Shuffle the tracks in place, the tracks before ``start`` keep their position.
+
+        Parameters
+        ---------
+        start: :class:`int`
+            the first position to shuffle, default skips the playing track
+        seed: :class:`int` | :class:`None`
+            the seed of the order, the same seed and queue give the same order.
+        """
+        rng = random.Random(seed) if seed is not None else random
+        shuffle_range(self._items, self._head + max(start, 0), rng)
@@ -0,0 +1,369 @@
+"""
+Keep the queues of the players out of the process memory, so a restarted bot gets them back.
+
+A store receives every queue change as a small operation, the queue is never written in full.
+Only the ``encoded`` blob and the requester of a track are saved, the tracks are decoded
+locally with :func:`lavaplay.codec.decode_track` on restore. a :class:`LazyTrack` is saved as its
+identifier with :data:`LAZY_PREFIX`, base64 blobs never have a ``:``.
+"""
+import os
+import json
+import random
+import asyncio
+import sqlite3
+import typing as t
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from .queue import shuffle_range
+
+_LOG = logging.getLogger("lavaplay.queue_store")
+
+Entry = t.Tuple[str, t.Optional[int]]
+"""A saved queue entry, the encoded track and the requester."""
+
+LAZY_PREFIX = "lazy:"
+"""The prefix of a saved :class:`LazyTrack` entry, followed by its identifier instead of a blob."""
+
+
+class QueueStore:
+    """
+    The base class for the stores of the player queues used by :class:`Node`.
+
+    The methods are async so a store can be shared between processes. The operations are the
+    same as :class:`Queue` operations and are applied in the order they are made.
+    """
+    async def load(self, guild_id: int) -> t.List[Entry]:
+        """
+        Get the saved queue of a guild, empty if none.
+
+        Parameters
+        ---------
+        guild_id: :class:`int`
+            the guild id of the player
+        """
+        raise NotImplementedError
+
+    async def append(self, guild_id: int, entries: t.Sequence[Entry]) -> None:
+        """
+        Add entries to the end of the queue.
+        """
+        raise NotImplementedError
+
+    async def popleft(self, guild_id: int) -> None:
+        """
+        Remove the first entry.
+        """
+        raise NotImplementedError
+
+    async def rotate(self, guild_id: int) -> None:
+        """
+        Move the first entry to the end.
+        """
+        raise NotImplementedError
+
+    async def remove(self, guild_id: int, index: int) -> None:
+        """
+        Remove the entry at a positive index.
+        """
+        raise NotImplementedError
+
+    async def shuffle(self, guild_id: int, start: int, seed: int) -> None:
+        """
+        Shuffle the entries from ``start`` with the seed used by :meth:`Queue.shuffle`.
+        """
+        raise NotImplementedError
+
+    async def clear(self, guild_id: int) -> None:
+        """
+        Remove the queue of a guild.
+        """
+        raise NotImplementedError
+
+
+class MemoryQueueStore(QueueStore):
+    """
+    A store in the process memory, the queues are lost on restart. useful to share the
+    queues between the nodes of a client and as a base for other stores.
+    """
+    def __init__(self) -> None:
+        self._queues: t.Dict[int, t.List[Entry]] = {}
+
+    async def load(self, guild_id: int) -> t.List[Entry]:
+        return list(self._queues.get(guild_id, ()))
+
+    def _apply(self, guild_id: int, op: str, *args: t.Any) -> None:
+        queue = self._queues.get(guild_id)
+        if op == "append":
+            if queue is None:
+                queue = self._queues[guild_id] = []
+            queue.extend(tuple(entry) for entry in args[0])
+            return
+        if op == "clear" or not queue:
+            self._queues.pop(guild_id, None)
+            return
+        if op == "popleft":
+            del queue[0]
+        elif op == "rotate":
+            queue.append(queue.pop(0))
+        elif op == "remove":
+            if args[0] < len(queue):
+                del queue[args[0]]
+        elif op == "shuffle":
+            shuffle_range(queue, args[0], random.Random(args[1]))
+        if not queue:
+            del self._queues[guild_id]
+
+    async def append(self, guild_id: int, entries: t.Sequence[Entry]) -> None:
+        self._apply(guild_id, "append", entries)
+
+    async def popleft(self, guild_id: int) -> None:
+        self._apply(guild_id, "popleft")
+
+    async def rotate(self, guild_id: int) -> None:
+        self._apply(guild_id, "rotate")
+
+    async def remove(self, guild_id: int, index: int) -> None:
+        self._apply(guild_id, "remove", index)
+
+    async def shuffle(self, guild_id: int, start: int, seed: int) -> None:
+        self._apply(guild_id, "shuffle", start, seed)
+
+    async def clear(self, guild_id: int) -> None:
+        self._apply(guild_id, "clear")
+
+
+class LogQueueStore(MemoryQueueStore):
+    """
+    A store writing every operation as a json line to an append-only file, the file is
+    read once on the first load and the queues are kept in memory after.
+
+    The file is read and written in a thread of the store, so the event loop never waits for the disk.
+
+    Parameters
+    ---------
+    path: :class:`str`
+        The log file path.
+    compact_after: :class:`int`
+        Rewrite the log with only the current queues after this many operations, ``0`` never rewrites.
+    """
+    def __init__(self, path: str, compact_after: int = 10000) -> None:
+        super().__init__()
+        self.path = path
+        self.compact_after = compact_after
+        self._loaded = False
+        self._written = 0
+        self._file: t.Optional[t.TextIO] = None
+        # one thread keeps the operations in order, the queues and the file are only used by it
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lavaplay-log")
+
+    async def _run(self, func: t.Callable[..., t.Any], *args: t.Any) -> t.Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _replay(self) -> None:
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # a line cut by a crash while writing
+                    _LOG.warning(f"Skipping a broken line in the queue log {self.path}")
+                    continue
+                self._apply(record["g"], record["op"], *record.get("a", ()))
+                self._written += 1
+
+    def _write(self, guild_id: int, op: str, *args: t.Any) -> None:
+        if not self._loaded:
+            self._replay()
+        self._apply(guild_id, op, *args)
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        record = {"g": guild_id, "op": op}
+        if args:
+            record["a"] = args
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        self._written += 1
+        if self.compact_after and self._written >= self.compact_after:
+            self._compact()
+
+    def _compact(self) -> None:
+        if not self._loaded:
+            self._replay()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        temp = f"{self.path}.tmp"
+        with open(temp, "w", encoding="utf-8") as file:
+            for guild_id, queue in self._queues.items():
+                file.write(json.dumps({"g": guild_id, "op": "append", "a": [queue]}) + "\n")
+        os.replace(temp, self.path)
+        self._written = len(self._queues)
+
+    async def compact(self) -> None:
+        """
+        Rewrite the log with one append operation for every queue.
+        """
+        await self._run(self._compact)
+
+    def _load(self, guild_id: int) -> t.List[Entry]:
+        if not self._loaded:
+            self._replay()
+        return list(self._queues.get(guild_id, ()))
+
+    async def load(self, guild_id: int) -> t.List[Entry]:
+        return await self._run(self._load, guild_id)
+
+    async def append(self, guild_id: int, entries: t.Sequence[Entry]) -> None:
+        await self._run(self._write, guild_id, "append", [list(entry) for entry in entries])
+
+    async def popleft(self, guild_id: int) -> None:
+        await self._run(self._write, guild_id, "popleft")
+
+    async def rotate(self, guild_id: int) -> None:
+        await self._run(self._write, guild_id, "rotate")
+
+    async def remove(self, guild_id: int, index: int) -> None:
+        await self._run(self._write, guild_id, "remove", index)
+
+    async def shuffle(self, guild_id: int, start: int, seed: int) -> None:
+        await self._run(self._write, guild_id, "shuffle", start, seed)
+
+    async def clear(self, guild_id: int) -> None:
+        await self._run(self._write, guild_id, "clear")
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        """
+        Close the log file, after the running operations.
+        """
+        self._executor.submit(self._close)
+        self._executor.shutdown(wait=True)
+
+
+class SQLiteQueueStore(QueueStore):
+    """
+    A store saving the queues in a sqlite file, every entry is a row ordered by its position.
+
+    The queries run one by one in a thread of the store, so a slow disk doesn't block the event loop.
+
+    Parameters
+    ---------
+    path: :class:`str`
+        The sqlite file path.
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # one thread keeps the operations in order, the connection is only used by it after this
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lavaplay-sqlite")
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS queue_entries ("
+            "guild_id INTEGER NOT NULL, position INTEGER NOT NULL, encoded TEXT NOT NULL, requester INTEGER, "
+            "PRIMARY KEY (guild_id, position))"
+        )
+        self._db.commit()
+
+    async def _run(self, func: t.Callable[..., t.Any], *args: t.Any) -> t.Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._transaction, func, args)
+
+    def _transaction(self, func: t.Callable[..., t.Any], args: tuple) -> t.Any:
+        # commits on success and rolls back on error
+        with self._db:
+            return func(*args)
+
+    def _bounds(self, guild_id: int) -> t.Tuple[t.Optional[int], t.Optional[int]]:
+        return self._db.execute(
+            "SELECT MIN(position), MAX(position) FROM queue_entries WHERE guild_id = ?", (guild_id,)
+        ).fetchone()
+
+    def _load(self, guild_id: int) -> t.List[Entry]:
+        rows = self._db.execute(
+            "SELECT encoded, requester FROM queue_entries WHERE guild_id = ? ORDER BY position", (guild_id,)
+        ).fetchall()
+        return [(encoded, requester) for encoded, requester in rows]
+
+    def _append(self, guild_id: int, entries: t.Sequence[Entry]) -> None:
+        last = self._bounds(guild_id)[1]
+        first = 0 if last is None else last + 1
+        self._db.executemany(
+            "INSERT INTO queue_entries (guild_id, position, encoded, requester) VALUES (?, ?, ?, ?)",
+            ((guild_id, first + offset, encoded, requester) for offset, (encoded, requester) in enumerate(entries))
+        )
+
+    def _popleft(self, guild_id: int) -> None:
+        self._db.execute(
+            "DELETE FROM queue_entries WHERE guild_id = ? AND position = "
+            "(SELECT MIN(position) FROM queue_entries WHERE guild_id = ?)",
+            (guild_id, guild_id)
+        )
+
+    def _rotate(self, guild_id: int) -> None:
+        first, last = self._bounds(guild_id)
+        if first is None or first == last:
+            return
+        self._db.execute(
+            "UPDATE queue_entries SET position = ? WHERE guild_id = ? AND position = ?", (last + 1, guild_id, first)
+        )
+
+    def _remove(self, guild_id: int, index: int) -> None:
+        self._db.execute(
+            "DELETE FROM queue_entries WHERE guild_id = ? AND position = "
+            "(SELECT position FROM queue_entries WHERE guild_id = ? ORDER BY position LIMIT 1 OFFSET ?)",
+            (guild_id, guild_id, index)
+        )
+
+    def _shuffle(self, guild_id: int, start: int, seed: int) -> None:
+        positions = [row[0] for row in self._db.execute(
+            "SELECT position FROM queue_entries WHERE guild_id = ? ORDER BY position", (guild_id,)
+        )]
+        order = list(positions)
+        shuffle_range(order, start, random.Random(seed))
+        # the moved rows go to free positions first, the primary key is checked on every row
+        offset = positions[-1] + 1 if positions else 0
+        moves = [(old, new) for old, new in zip(order, positions) if old != new]
+        self._db.executemany(
+            "UPDATE queue_entries SET position = ? WHERE guild_id = ? AND position = ?",
+            ((offset + new, guild_id, old) for old, new in moves)
+        )
+        self._db.execute(
+            "UPDATE queue_entries SET position = position - ? WHERE guild_id = ? AND position >= ?",
+            (offset, guild_id, offset)
+        )
+
+    def _clear(self, guild_id: int) -> None:
+        self._db.execute("DELETE FROM queue_entries WHERE guild_id = ?", (guild_id,))
+
+    async def load(self, guild_id: int) -> t.List[Entry]:
+        return await self._run(self._load, guild_id)
+
+    async def append(self, guild_id: int, entries: t.Sequence[Entry]) -> None:
+        await self._run(self._append, guild_id, list(entries))
+
+    async def popleft(self, guild_id: int) -> None:
+        await self._run(self._popleft, guild_id)
+
+    async def rotate(self, guild_id: int) -> None:
+        await self._run(self._rotate, guild_id)
+
+    async def remove(self, guild_id: int, index: int) -> None:
+        await self._run(self._remove, guild_id, index)
+
+    async def shuffle(self, guild_id: int, start: int, seed: int) -> None:
+        await self._run(self._shuffle, guild_id, start, seed)
+
+    async def clear(self, guild_id: int) -> None:
+        await self._run(self._clear, guild_id)
+
+    def close(self) -> None:
+        """
+        Close the sqlite file, after the running operations.
+        """
+        self._executor.submit(self._db.close)
+        self._executor.shutdown(wait=True)
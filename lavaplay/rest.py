@@ -1,10 +1,15 @@
+import asyncio
 import aiohttp
 from . import routes
+from . import jsonlib
 import logging
 import typing as t
+from collections import Counter
 from .exceptions import requestFailed
+from .scheduler import RequestScheduler, CONTROL, LOAD, STATS
 
 _LOG = logging.getLogger("lavaplay.rest")
+_JSON_HEADERS = {"Content-Type": "application/json"}
 
 class RestApi:
     """
@@ -22,15 +27,80 @@ class RestApi:
         Is server using ssl.
     version: :class:`str`
         The version for lavalink server, default version is `v4`, newer version and recommend.
+    pool_size: :class:`int`
+        The max number of connections kept open to the node, default is ``100``.
+    keepalive_timeout: :class:`float`
+        How many seconds an idle connection stays open for reuse, default is ``30``.
+    dns_cache_ttl: :class:`int`
+        How many seconds a resolved host address is cached, default is ``300``.
+    max_in_flight: :class:`int` | :class:`None`
+        The max requests running at the same time, the others wait by priority, player control first,
+        then loading tracks and last the stats. default is ``pool_size``.
     """
-    def __init__(self, *, host: str = "127.0.0.1", port: int, password: str, ssl: bool = False, version: t.Literal["v3", "v4"] = "v4") -> None:
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int,
+        password: str,
+        ssl: bool = False,
+        version: t.Literal["v3", "v4"] = "v4",
+        pool_size: int = 100,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+        max_in_flight: t.Optional[int] = None,
+    ) -> None:
         self.rest_uri = f"{'https' if ssl else 'http'}://{host}:{port}"
         self.api_version = version
         self.headers = {
             "Authorization": password
         }
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._session: t.Optional[aiohttp.ClientSession] = None
+        self.scheduler = RequestScheduler(max_in_flight or pool_size)
+        # in flight requests shared by identical concurrent calls, see :meth:`_single_flight`
+        self._inflight: t.Dict[t.Tuple[str, str], asyncio.Future] = {}
+        self.coalesced_requests: t.Counter[str] = Counter()
+        """The count of calls served by an identical request already in flight, by method name."""
 
-    async def request(self, method: str, rout: str, data: dict = {}, without_version: bool = False) -> dict:
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        The pooled session shared by all requests to this node, created on first use.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers)
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Close the pooled session and release all its connections.
+        """
+        if self._session is None or self._session.closed:
+            return
+        await self._session.close()
+        # Give the transports a chance to close, see aiohttp graceful shutdown docs.
+        await asyncio.sleep(0)
+        self._session = None
+
+    async def request(
+        self,
+        method: str,
+        rout: str,
+        data: dict = {},
+        without_version: bool = False,
+        priority: int = LOAD,
+        guild_id: t.Optional[int] = None
+    ) -> dict:
         """
         This function makes a request to the rest api for lavalink
 
@@ -42,6 +112,11 @@ class RestApi:
             The route for request.
         data: :class:`dict`
             The data for request.
+        priority: :class:`int`
+            The priority of the request when the node has too many requests in flight,
+            :data:`~lavaplay.scheduler.CONTROL`, :data:`~lavaplay.scheduler.LOAD` or :data:`~lavaplay.scheduler.STATS`.
+        guild_id: :class:`int` | :class:`None`
+            The guild of the request, waiting requests of a priority are started in turns between the guilds.
 
         Returns
         -------
@@ -49,18 +124,42 @@ class RestApi:
             The response from the request.
         """
         rout = rout if without_version else f"/{self.api_version}{rout}"
-        async with aiohttp.ClientSession() as session:
-            async with session.request(method, self.rest_uri + rout, headers=self.headers, json=data) as response:
-                _LOG.debug(f"{method} {self.rest_uri + rout}")
-                if method == "DELETE":
-                    return
-                response = await response.json()
-                print(response)
-                if response.get("error") is not None:
-                    _LOG.error(f"Request failed: {response}")
-                    raise requestFailed(**response)
-                return response
+        async with self.scheduler.slot(priority, guild_id), \
+                self.session.request(method, self.rest_uri + rout, data=jsonlib.dumps(data), headers=_JSON_HEADERS) as response:
+            _LOG.debug(f"{method} {self.rest_uri + rout}")
+            if method == "DELETE":
+                return
+            body = await response.read()
+            if not body:
+                return None
+            response = jsonlib.loads(body)
+            if isinstance(response, dict) and response.get("error") is not None:
+                _LOG.error(f"Request failed: {response}")
+                raise requestFailed(**response)
+            return response
     
+    async def _single_flight(self, name: str, key: str, factory: t.Callable[[], t.Awaitable[dict]]) -> dict:
+        """
+        Run the request once for concurrent calls with the same key, every caller gets the same result.
+        The result is shared, so callers must not change it.
+        """
+        future = self._inflight.get((name, key))
+        if future is not None:
+            self.coalesced_requests[name] += 1
+            return await asyncio.shield(future)
+        future = asyncio.ensure_future(factory())
+        self._inflight[(name, key)] = future
+
+        def done(future: asyncio.Future) -> None:
+            self._inflight.pop((name, key), None)
+            # mark the error as retrieved when every caller was cancelled
+            if not future.cancelled():
+                future.exception()
+
+        future.add_done_callback(done)
+        # shielded so a cancelled caller doesn't cancel the request for the others
+        return await asyncio.shield(future)
+
     async def load_tracks(self, identifier: str) -> dict:
         """
         This function makes a request to the rest api for lavalink
@@ -75,7 +174,10 @@ class RestApi:
         :class:`dict`
             The response from the request.
         """
-        res = await self.request("GET", routes.TRACK_LOADING.format(identifier=identifier))
+        res = await self._single_flight(
+            "load_tracks", identifier,
+            lambda: self.request("GET", routes.TRACK_LOADING.format(identifier=identifier))
+        )
         return res
     
     async def decode_track(self, track: str) -> dict:
@@ -92,7 +194,10 @@ class RestApi:
         :class:`dict`
             The response from the request.
         """
-        res = await self.request("GET", routes.TRACK_DECODEING.format(encodedTrack=track))
+        res = await self._single_flight(
+            "decode_track", track,
+            lambda: self.request("GET", routes.TRACK_DECODEING.format(encodedTrack=track))
+        )
         return res
     
     async def decode_tracks(self, tracks: list) -> dict:
@@ -121,7 +226,7 @@ class RestApi:
         :class:`dict`
             The response from the request.
         """
-        res = await self.request("GET", routes.INFO)
+        res = await self.request("GET", routes.INFO, priority=STATS)
         return res
     
     async def stats(self) -> dict:
@@ -133,7 +238,7 @@ class RestApi:
         :class:`dict`
             The response from the request.
         """
-        res = await self.request("GET", routes.STATS)
+        res = await self.request("GET", routes.STATS, priority=STATS)
         return res
     
     async def router_planner(self) -> dict:
@@ -145,7 +250,7 @@ class RestApi:
         :class:`dict`
             The response from the request.
         """
-        res = await self.request("GET", routes.ROUTEPLANNER)
+        res = await self.request("GET", routes.ROUTEPLANNER, priority=STATS)
         return res
     
     async def unmark_failed_address(self, address: str) -> dict:
@@ -162,7 +267,7 @@ class RestApi:
         :class:`dict`
             The response from the request.
         """
-        res = await self.request("POST", routes.UNMARK_FAILED_ADDRESS, data={"address": address})
+        res = await self.request("POST", routes.UNMARK_FAILED_ADDRESS, data={"address": address}, priority=STATS)
         return res
     
     async def unmark_all_failed_address(self) -> dict:
@@ -174,7 +279,7 @@ class RestApi:
         :class:`dict`
             The response from the request.
         """
-        res = await self.request("POST", routes.UNMARK_ALL_FAILED_ADDRESS)
+        res = await self.request("POST", routes.UNMARK_ALL_FAILED_ADDRESS, priority=STATS)
         return res
     
     async def get_players(self, session_id: str) -> dict:
@@ -210,7 +315,7 @@ class RestApi:
         :class:`dict`
             The response from the request.
         """
-        res = await self.request("GET", routes.GET_PLAYER.format(sessionId=session_id, guildId=guild_id))
+        res = await self.request("GET", routes.GET_PLAYER.format(sessionId=session_id, guildId=guild_id), guild_id=guild_id)
         return res
     
     async def update_player(self, session_id: str, guild_id: int, noReplace: bool = False, data: dict = {}) -> dict:
@@ -231,7 +336,7 @@ class RestApi:
         :class:`dict`
             The response from the request.
         """
-        res = await self.request("PATCH", routes.UPDATE_PLAYER.format(sessionId=session_id, guildId=guild_id, noReplace="true" if noReplace else "false"), data=data)
+        res = await self.request("PATCH", routes.UPDATE_PLAYER.format(sessionId=session_id, guildId=guild_id, noReplace="true" if noReplace else "false"), data=data, priority=CONTROL, guild_id=guild_id)
         return res
     
     async def destroy_player(self, session_id: str, guild_id: int) -> None:
@@ -245,7 +350,7 @@ class RestApi:
         guild_id: :class:`str`
             The guild id for destroy player.
         """
-        await self.request("DELETE", routes.DESTROY_PLAYER.format(sessionId=session_id, guildId=guild_id))
+        await self.request("DELETE", routes.DESTROY_PLAYER.format(sessionId=session_id, guildId=guild_id), priority=CONTROL, guild_id=guild_id)
         
     async def update_session(self, session_id: str, data: dict) -> dict:
         """
@@ -263,7 +368,7 @@ class RestApi:
         :class:`dict`
             The response from the request.
         """
-        res = await self.request("PATCH", routes.UPDATE_SESSION.format(sessionId=session_id), data=data)
+        res = await self.request("PATCH", routes.UPDATE_SESSION.format(sessionId=session_id), data=data, priority=CONTROL)
         return res
 
     async def version(self) -> dict:
@@ -275,6 +380,6 @@ class RestApi:
         :class:`dict`
             The response from the request.
         """
-        res = await self.request("GET", routes.VERSION, without_version=True)
+        res = await self.request("GET", routes.VERSION, without_version=True, priority=STATS)
         return res
 
@@ -0,0 +1,167 @@
+"""
+Limit the REST requests in flight to a node, the waiting requests are started by priority and
+in turns between the guilds, so a mass update of one guild or a big load doesn't delay the others.
+"""
+import time
+import asyncio
+import typing as t
+import logging
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+_LOG = logging.getLogger("lavaplay.scheduler")
+
+CONTROL = 0
+"""The priority of player control requests like pause, seek and play."""
+LOAD = 1
+"""The priority of loading and decoding tracks and getting players."""
+STATS = 2
+"""The priority of node info and stats requests."""
+
+PRIORITIES = (CONTROL, LOAD, STATS)
+
+
+@dataclass
+class WaitStats:
+    """
+    The time requests of a priority waited for a free slot, in seconds.
+    """
+    requests: int = 0
+    waited: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def average(self) -> float:
+        """
+        The average wait in seconds of all the requests.
+        """
+        return self.total / self.requests if self.requests else 0.0
+
+
+@dataclass
+class SchedulerStats:
+    """
+    The counters of a :class:`RequestScheduler`.
+    """
+    wait: t.Dict[int, WaitStats] = field(default_factory=lambda: {priority: WaitStats() for priority in PRIORITIES})
+    max_in_flight_seen: int = 0
+
+
+class RequestScheduler:
+    """
+    Run at most ``max_in_flight`` requests at the same time.
+
+    When all the slots are used, the next free slot goes to the highest priority waiting, and
+    inside a priority to the guilds in turns, one request for every guild with waiting requests.
+
+    Parameters
+    ---------
+    max_in_flight: :class:`int`
+        The max requests running at the same time.
+    """
+    def __init__(self, max_in_flight: int = 100) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.stats = SchedulerStats()
+        # priority -> guild id -> the waiting requests of the guild, the guilds are in turn order
+        self._waiters: t.Dict[int, "OrderedDict[t.Optional[int], t.Deque[asyncio.Future]]"] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+
+    def queue_depth(self, priority: t.Optional[int] = None) -> int:
+        """
+        The count of requests waiting for a slot.
+
+        Parameters
+        ---------
+        priority: :class:`int` | :class:`None`
+            only count the requests of a priority, ``None`` for all.
+        """
+        priorities = PRIORITIES if priority is None else (priority,)
+        return sum(len(waiters) for p in priorities for waiters in self._waiters[p].values())
+
+    @asynccontextmanager
+    async def slot(self, priority: int = LOAD, guild_id: t.Optional[int] = None) -> t.AsyncIterator[None]:
+        """
+        Wait for a free slot and hold it for the block.
+
+        Parameters
+        ---------
+        priority: :class:`int`
+            :data:`CONTROL`, :data:`LOAD` or :data:`STATS`
+        guild_id: :class:`int` | :class:`None`
+            the guild of the request, ``None`` requests share one turn.
+        """
+        await self._acquire(priority, guild_id)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int, guild_id: t.Optional[int]) -> None:
+        stats = self.stats.wait[priority]
+        stats.requests += 1
+        if self.in_flight < self.max_in_flight and not self.queue_depth():
+            self._start()
+            return
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        guilds = self._waiters[priority]
+        waiters = guilds.get(guild_id)
+        if waiters is None:
+            waiters = guilds[guild_id] = deque()
+        waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was given right before the cancel, pass it on
+                self._release()
+            else:
+                self._discard(priority, guild_id, future)
+            raise
+        waited = time.monotonic() - started
+        stats.waited += 1
+        stats.total += waited
+        if waited > stats.max:
+            stats.max = waited
+
+    def _start(self) -> None:
+        self.in_flight += 1
+        if self.in_flight > self.stats.max_in_flight_seen:
+            self.stats.max_in_flight_seen = self.in_flight
+
+    def _discard(self, priority: int, guild_id: t.Optional[int], future: asyncio.Future) -> None:
+        guilds = self._waiters[priority]
+        waiters = guilds.get(guild_id)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(future)
+        except ValueError:
+            return
+        if not waiters:
+            del guilds[guild_id]
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        # the slot is handed to the next waiting request, so a new request can't take it first
+        for priority in PRIORITIES:
+            guilds = self._waiters[priority]
+            while guilds:
+                guild_id, waiters = next(iter(guilds.items()))
+                future = waiters.popleft()
+                if waiters:
+                    # the guild goes to the end of the turn
+                    guilds.move_to_end(guild_id)
+                else:
+                    del guilds[guild_id]
+                if future.done():
+                    continue
+                self._start()
+                future.set_result(None)
+                return
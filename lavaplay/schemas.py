@@ -0,0 +1,131 @@
+"""
+Decode the lavalink websocket payloads straight to the :mod:`lavaplay.events` and
+:mod:`lavaplay.objects` types in one pass, without changing or copying the payload.
+
+The payload keys not known by the schema are kept in the ``extras`` dict of the object.
+"""
+import dataclasses
+import typing as t
+from .objects import BaseObject, Cpu, FrameStats, Memory, PlayerState, Stats, Track
+from .events import (
+    ReadyEvent, PlayerUpdateEvent, TrackStartEvent, TrackEndEvent,
+    TrackException, TrackExceptionEvent, TrackStuckEvent, WebSocketClosedEvent
+)
+from .utlits import event_track
+
+_MISSING = object()
+
+
+class Schema:
+    """
+    A compiled decoder from a payload dict to a dataclass.
+
+    Parameters
+    ---------
+    cls: :class:`type`
+        the dataclass to create
+    keys: :class:`dict`
+        the payload key of the fields named differently
+    converters: :class:`dict`
+        a function by field name to convert the value, not called for ``None``
+    ignore: :class:`tuple`
+        payload keys to skip without keeping them in the extras, like ``op``
+    """
+    __slots__ = ("cls", "_fields", "_known", "_ignore")
+
+    def __init__(
+        self,
+        cls: t.Type[BaseObject],
+        keys: t.Optional[t.Dict[str, str]] = None,
+        converters: t.Optional[t.Dict[str, t.Callable[[t.Any], t.Any]]] = None,
+        ignore: t.Tuple[str, ...] = ()
+    ) -> None:
+        keys = keys or {}
+        converters = converters or {}
+        self.cls = cls
+        fields = []
+        for field in dataclasses.fields(cls):
+            if not field.init:
+                continue
+            default = _MISSING if field.default is dataclasses.MISSING else field.default
+            factory = None if field.default_factory is dataclasses.MISSING else field.default_factory
+            fields.append((keys.get(field.name, field.name), converters.get(field.name), default, factory))
+        self._fields = tuple(fields)
+        self._ignore = tuple(ignore)
+        self._known = frozenset(field[0] for field in fields) | frozenset(ignore)
+
+    def decode(self, payload: dict) -> t.Any:
+        """
+        Create the object from a payload.
+
+        Parameters
+        ---------
+        payload: :class:`dict`
+            the payload from lavalink
+
+        Raises
+        --------
+        :exc:`KeyError`
+            if a required key is missing.
+        """
+        args = []
+        found = 0
+        for key, convert, default, factory in self._fields:
+            value = payload.get(key, _MISSING)
+            if value is _MISSING:
+                if factory is not None:
+                    value = factory()
+                elif default is _MISSING:
+                    raise KeyError(f"{self.cls.__name__} payload is missing {key!r}")
+                else:
+                    value = default
+            else:
+                found += 1
+                if convert is not None and value is not None:
+                    value = convert(value)
+            args.append(value)
+        obj = self.cls(*args)
+        for key in self._ignore:
+            if key in payload:
+                found += 1
+        if len(payload) > found:
+            obj.extras = {key: value for key, value in payload.items() if key not in self._known}
+        return obj
+
+
+def _seconds(milliseconds: int) -> float:
+    # the player positions are saved in seconds
+    return milliseconds / 1000
+
+
+def _track(payload: dict) -> Track:
+    return event_track(payload)[0]
+
+
+MEMORY = Schema(Memory)
+CPU = Schema(Cpu)
+FRAME_STATS = Schema(FrameStats)
+STATS = Schema(
+    Stats,
+    converters={"memory": MEMORY.decode, "cpu": CPU.decode, "frameStats": FRAME_STATS.decode},
+    ignore=("op",)
+)
+PLAYER_STATE = Schema(PlayerState, converters={"position": _seconds})
+READY = Schema(ReadyEvent, ignore=("op",))
+PLAYER_UPDATE = Schema(PlayerUpdateEvent, converters={"guildId": int, "state": PLAYER_STATE.decode}, ignore=("op",))
+
+_EVENT_KEYS = {"guild_id": "guildId"}
+_EVENT_CONVERTERS = {"guild_id": int, "track": _track}
+_EVENT_IGNORE = ("op", "type")
+
+TRACK_EXCEPTION = Schema(TrackException)
+EVENTS: t.Dict[str, Schema] = {
+    "TrackStartEvent": Schema(TrackStartEvent, _EVENT_KEYS, _EVENT_CONVERTERS, _EVENT_IGNORE),
+    "TrackEndEvent": Schema(TrackEndEvent, _EVENT_KEYS, _EVENT_CONVERTERS, _EVENT_IGNORE),
+    "TrackExceptionEvent": Schema(
+        TrackExceptionEvent, _EVENT_KEYS, {**_EVENT_CONVERTERS, "exception": TRACK_EXCEPTION.decode}, _EVENT_IGNORE
+    ),
+    "TrackStuckEvent": Schema(TrackStuckEvent, _EVENT_KEYS, _EVENT_CONVERTERS, _EVENT_IGNORE),
+    "WebSocketClosedEvent": Schema(WebSocketClosedEvent, _EVENT_KEYS, _EVENT_CONVERTERS, _EVENT_IGNORE),
+}
+"""The schemas of the ``event`` op by event type."""
@@ -0,0 +1,505 @@
+"""
+Run the players of a bot split over many processes, one process for every discord shard.
+
+A guild is owned by the process of its shard, ``(guild_id >> 22) % shard_count``, only that process
+keeps its player. The processes share the health and stats of the nodes, and the control commands
+for a guild are sent to the owning process, over an :class:`IPCBackend`.
+"""
+import os
+import time
+import asyncio
+import dataclasses
+import typing as t
+import logging
+from .client import Lavalink
+from .node_manager import Node
+from .player import Player
+from .balancer import NodeStrategy
+from .objects import Stats
+from .events import StatsUpdateEvent, ReadyEvent, NodeDisconnectedEvent
+from .exceptions import NodeError
+from . import schemas
+from . import jsonlib
+
+_LOG = logging.getLogger("lavaplay.sharding")
+
+Handler = t.Callable[[dict], t.Awaitable[t.Optional[dict]]]
+
+COMMANDS = ("stop", "skip")
+"""The player commands that can be sent to the owning process."""
+
+
+def shard_for(guild_id: int, shard_count: int) -> int:
+    """
+    The discord shard of a guild.
+
+    Parameters
+    ---------
+    guild_id: :class:`int`
+        the guild id
+    shard_count: :class:`int`
+        the count of shards
+    """
+    return (guild_id >> 22) % shard_count
+
+
+class IPCBackend:
+    """
+    The base class for the messages between the shard processes.
+
+    Messages are json serializable dicts, subclass it to use another transport like redis.
+    """
+    async def start(self, shard_id: int, shard_count: int, handler: Handler) -> None:
+        """
+        Start receiving the messages of the other shards.
+
+        Parameters
+        ---------
+        shard_id: :class:`int`
+            the shard of this process
+        shard_count: :class:`int`
+            the count of shards
+        handler: :class:`function`
+            the async function called with every received message, its result is the reply.
+        """
+        raise NotImplementedError
+
+    async def send(self, shard_id: int, message: dict) -> t.Optional[dict]:
+        """
+        Send a message to a shard and wait for the reply.
+
+        Parameters
+        ---------
+        shard_id: :class:`int`
+            the shard to send to
+        message: :class:`dict`
+            the message
+
+        Raises
+        --------
+        :exc:`ConnectionError`
+            if the shard can't be reached.
+        :exc:`asyncio.TimeoutError`
+            if the shard didn't reply in time, the message may have been handled.
+        """
+        raise NotImplementedError
+
+    async def broadcast(self, message: dict) -> None:
+        """
+        Send a message to all the other shards without a reply, unreachable shards are skipped.
+
+        Parameters
+        ---------
+        message: :class:`dict`
+            the message
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """
+        Stop receiving messages and close the connections.
+        """
+        raise NotImplementedError
+
+
+class LocalSocketBackend(IPCBackend):
+    """
+    Messages over unix sockets, for the shard processes on the same machine.
+
+    Every shard listens on ``{directory}/{prefix}-{shard_id}.sock``, a message is a json line.
+
+    Parameters
+    ---------
+    directory: :class:`str`
+        the directory of the socket files
+    prefix: :class:`str`
+        the prefix of the socket files, use a different prefix for every bot on the machine.
+    timeout: :class:`float`
+        How many seconds to wait for a shard to connect or reply.
+    """
+    def __init__(self, directory: str = "/tmp", prefix: str = "lavaplay-shard", timeout: float = 5.0) -> None:
+        self.directory = directory
+        self.prefix = prefix
+        self.timeout = timeout
+        self.shard_id: t.Optional[int] = None
+        self.shard_count = 0
+        self._handler: t.Optional[Handler] = None
+        self._server: t.Optional[asyncio.AbstractServer] = None
+        # shard id -> the connection to the shard, requests on a connection are made one by one
+        self._connections: t.Dict[int, t.Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = {}
+        self._locks: t.Dict[int, asyncio.Lock] = {}
+        # the tasks serving the connections of the other shards, closed with the server
+        self._serving: t.Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    def path(self, shard_id: int) -> str:
+        """
+        The socket file of a shard.
+        """
+        return os.path.join(self.directory, f"{self.prefix}-{shard_id}.sock")
+
+    async def start(self, shard_id: int, shard_count: int, handler: Handler) -> None:
+        self.shard_id = shard_id
+        self.shard_count = shard_count
+        self._handler = handler
+        path = self.path(shard_id)
+        # a socket file left by a crashed process
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = await asyncio.start_unix_server(self._serve, path)
+        _LOG.info(f"Shard {shard_id} listening on {path}")
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._serving[task] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                frame = jsonlib.loads(line)
+                try:
+                    result = await self._handler(frame["message"])
+                except Exception as error:
+                    _LOG.exception("Error while handling a shard message")
+                    result = {"ok": False, "error": repr(error)}
+                if frame.get("reply"):
+                    writer.write(jsonlib.dumps({"message": result}).encode() + b"\n")
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # cancelled by close, the stream callback logs a cancelled task as an error
+            pass
+        finally:
+            self._serving.pop(task, None)
+            writer.close()
+
+    async def _request(self, shard_id: int, message: dict, reply: bool) -> t.Optional[dict]:
+        lock = self._locks.get(shard_id)
+        if lock is None:
+            lock = self._locks[shard_id] = asyncio.Lock()
+        async with lock:
+            # a kept connection can be closed by a restarted shard, the message is sent again on a
+            # new connection only when the kept one failed before the shard could handle it
+            for retry in (False, True):
+                connection = self._connections.get(shard_id)
+                kept = connection is not None
+                try:
+                    if connection is None:
+                        connection = await asyncio.wait_for(
+                            asyncio.open_unix_connection(self.path(shard_id)), self.timeout
+                        )
+                        self._connections[shard_id] = connection
+                    reader, writer = connection
+                    writer.write(jsonlib.dumps({"reply": reply, "message": message}).encode() + b"\n")
+                    await writer.drain()
+                    if not reply:
+                        return None
+                    line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if not line:
+                        raise ConnectionResetError(f"Shard {shard_id} closed the connection")
+                    return jsonlib.loads(line)["message"]
+                except asyncio.TimeoutError:
+                    self._drop(shard_id)
+                    if connection is None:
+                        raise ConnectionError(f"Could not reach shard {shard_id}: connect timed out") from None
+                    # the shard may still be handling the message, sending it again could run it twice
+                    raise asyncio.TimeoutError(f"Shard {shard_id} did not reply in {self.timeout}s") from None
+                except OSError as error:
+                    self._drop(shard_id)
+                    if retry or not kept:
+                        raise ConnectionError(f"Could not reach shard {shard_id}: {error!r}") from None
+
+    def _drop(self, shard_id: int) -> None:
+        connection = self._connections.pop(shard_id, None)
+        if connection is not None:
+            connection[1].close()
+
+    async def send(self, shard_id: int, message: dict) -> t.Optional[dict]:
+        return await self._request(shard_id, message, True)
+
+    async def broadcast(self, message: dict) -> None:
+        async def send(shard_id: int):
+            try:
+                await self._request(shard_id, message, False)
+            except ConnectionError as error:
+                _LOG.debug(str(error))
+
+        await asyncio.gather(*(send(shard_id) for shard_id in range(self.shard_count) if shard_id != self.shard_id))
+
+    async def close(self) -> None:
+        for shard_id in list(self._connections):
+            self._drop(shard_id)
+        if self._server is not None:
+            self._server.close()
+            # a closed shard stops handling the messages of the connections already accepted
+            serving = list(self._serving)
+            for task, writer in self._serving.items():
+                writer.close()
+                task.cancel()
+            await asyncio.gather(*serving, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+            path = self.path(self.shard_id)
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+@dataclasses.dataclass
+class NodeHealth:
+    """
+    The health of a node seen by another shard.
+    """
+    shard_id: int
+    connected: bool
+    stats: t.Optional[Stats]
+    updated_at: float
+
+
+class ShardedLavalink(Lavalink):
+    """
+    A :class:`Lavalink` for one shard process, it keeps only the players of the guilds of its shard.
+
+    Call :meth:`start` in every process before using it, the processes share the health and
+    stats of the nodes, and :meth:`stop` and :meth:`skip` reach the player in its owning process.
+
+    >>> lavalink = ShardedLavalink(shard_id, shard_count, LocalSocketBackend())
+    >>> node = lavalink.create_node(host="127.0.0.1", port=2333, password="youshallnotpass", user_id=bot_id)
+    >>> await lavalink.start()
+
+    Parameters
+    ---------
+    shard_id: :class:`int`
+        The shard of this process.
+    shard_count: :class:`int`
+        The count of shards, also sent to the nodes as the shard count.
+    ipc: :class:`IPCBackend` | :class:`None`
+        The backend for the messages between the shards, default is :class:`LocalSocketBackend`.
+    strategy: :class:`NodeStrategy`
+        The strategy to pick a node for new players.
+    failover: :class:`bool`
+        Move the players of a disconnected node to the best connected node.
+    health_ttl: :class:`float`
+        How many seconds the node health sent by another shard is used.
+    """
+    def __init__(
+        self,
+        shard_id: int,
+        shard_count: int,
+        ipc: t.Optional[IPCBackend] = None,
+        strategy: t.Optional[NodeStrategy] = None,
+        failover: bool = True,
+        health_ttl: float = 120
+    ) -> None:
+        if not 0 <= shard_id < shard_count:
+            raise ValueError(f"shard_id must be in range from 0 to {shard_count - 1}")
+        super().__init__(strategy=strategy, failover=failover)
+        self.shard_id = shard_id
+        self.shard_count = shard_count
+        self.ipc: IPCBackend = ipc or LocalSocketBackend()
+        self.health_ttl = health_ttl
+        # node name -> shard id -> the last health sent by the shard
+        self.peer_health: t.Dict[str, t.Dict[int, NodeHealth]] = {}
+
+    def shard_for(self, guild_id: int) -> int:
+        """
+        The shard owning a guild.
+
+        Parameters
+        ---------
+        guild_id: :class:`int`
+            The guild id.
+        """
+        return shard_for(guild_id, self.shard_count)
+
+    def owns(self, guild_id: int) -> bool:
+        """
+        Return if the guild is owned by this process.
+
+        Parameters
+        ---------
+        guild_id: :class:`int`
+            The guild id.
+        """
+        return self.shard_for(guild_id) == self.shard_id
+
+    async def start(self) -> None:
+        """
+        Start receiving the messages of the other shards.
+        """
+        await self.ipc.start(self.shard_id, self.shard_count, self._on_message)
+
+    async def close(self) -> None:
+        """
+        Stop the messages with the other shards.
+        """
+        await self.ipc.close()
+
+    def create_node(self, host: str, port: int, password: str, user_id: int, **kwargs) -> Node:
+        kwargs.setdefault("shard_count", self.shard_count)
+        node = super().create_node(host, port, password, user_id, **kwargs)
+        for event in (ReadyEvent, StatsUpdateEvent, NodeDisconnectedEvent):
+            node.event_manager.add_listener(event, self._share_health)
+        return node
+
+    create_node.__doc__ = Lavalink.create_node.__doc__
+
+    def destroy_node(self, node: Node):
+        for event in (ReadyEvent, StatsUpdateEvent, NodeDisconnectedEvent):
+            node.event_manager.remove_listener(event, self._share_health)
+        super().destroy_node(node)
+
+    destroy_node.__doc__ = Lavalink.destroy_node.__doc__
+
+    def create_player(self, guild_id: int) -> Player:
+        """
+        Create a player for a guild of this shard, or return the existing player of the guild.
+
+        Parameters
+        ---------
+        guild_id: :class:`int`
+            The guild id for player.
+
+        Raises
+        --------
+        :exc:`.NodeError`
+            If the guild is owned by another shard.
+        """
+        if not self.owns(guild_id):
+            raise NodeError(f"Guild {guild_id} is owned by shard {self.shard_for(guild_id)}", guild_id)
+        return super().create_player(guild_id)
+
+    def best_node(self, guild_id: t.Optional[int] = None) -> t.Optional[Node]:
+        """
+        Pick the best connected node with the strategy, nodes reported disconnected by another
+        shard are skipped unless no other node is connected.
+
+        Parameters
+        ---------
+        guild_id: :class:`int` | :class:`None`
+            The guild id of the new player.
+        """
+        nodes = [node for node in self._nodes if node.is_connect]
+        if not nodes:
+            return None
+        healthy = [node for node in nodes if self.is_healthy(node)]
+        return self.strategy.select(healthy or nodes, guild_id)
+
+    def is_healthy(self, node: Node) -> bool:
+        """
+        Return ``False`` if another shard reported the node disconnected in the last ``health_ttl`` seconds.
+
+        Parameters
+        ---------
+        node: :class:`Node`
+            The node to check.
+        """
+        now = time.monotonic()
+        for health in self.peer_health.get(node.name, {}).values():
+            if not health.connected and now - health.updated_at < self.health_ttl:
+                return False
+        return True
+
+    async def stop(self, guild_id: int) -> bool:
+        """
+        Stop the player of a guild in its owning process.
+
+        Parameters
+        ---------
+        guild_id: :class:`int`
+            The guild id.
+
+        Returns
+        -------
+        :class:`bool`
+            ``False`` if the guild has no player.
+
+        Raises
+        --------
+        :exc:`ConnectionError`
+            if the owning shard can't be reached.
+        :exc:`asyncio.TimeoutError`
+            if the owning shard didn't reply in time, the command may have run.
+        """
+        return await self._command("stop", guild_id)
+
+    async def skip(self, guild_id: int) -> bool:
+        """
+        Skip the track of a guild in its owning process.
+
+        Parameters
+        ---------
+        guild_id: :class:`int`
+            The guild id.
+
+        Returns
+        -------
+        :class:`bool`
+            ``False`` if the guild has no player.
+
+        Raises
+        --------
+        :exc:`ConnectionError`
+            if the owning shard can't be reached.
+        :exc:`asyncio.TimeoutError`
+            if the owning shard didn't reply in time, the command may have run.
+        """
+        return await self._command("skip", guild_id)
+
+    async def _command(self, command: str, guild_id: int) -> bool:
+        shard_id = self.shard_for(guild_id)
+        if shard_id == self.shard_id:
+            return await self._run_command(command, guild_id)
+        reply = await self.ipc.send(shard_id, {"op": "command", "command": command, "guildId": guild_id})
+        if reply is not None and reply.get("error"):
+            raise NodeError(f"Shard {shard_id} failed to {command}: {reply['error']}", guild_id)
+        return bool(reply and reply.get("ok"))
+
+    async def _run_command(self, command: str, guild_id: int) -> bool:
+        player = self.get_player(guild_id)
+        if player is None:
+            return False
+        await getattr(player, command)()
+        return True
+
+    def _health_message(self) -> dict:
+        return {
+            "op": "health",
+            "shard": self.shard_id,
+            "nodes": [
+                {
+                    "name": node.name,
+                    "connected": node.is_connect,
+                    "stats": dataclasses.asdict(node.stats) if node.stats is not None else None
+                }
+                for node in self._nodes
+            ]
+        }
+
+    async def _share_health(self, event: t.Any) -> None:
+        await self.ipc.broadcast(self._health_message())
+
+    async def _on_message(self, message: dict) -> t.Optional[dict]:
+        op = message.get("op")
+        if op == "command":
+            if message["command"] not in COMMANDS:
+                return {"ok": False, "error": f"Unknown command {message['command']}"}
+            return {"ok": await self._run_command(message["command"], int(message["guildId"]))}
+        if op == "health":
+            self._update_health(message)
+            return None
+        _LOG.warning(f"Unknown shard message: {op}")
+        return None
+
+    def _update_health(self, message: dict) -> None:
+        now = time.monotonic()
+        nodes = {node.name: node for node in self._nodes}
+        for info in message["nodes"]:
+            stats = schemas.STATS.decode(info["stats"]) if info["stats"] is not None else None
+            self.peer_health.setdefault(info["name"], {})[message["shard"]] = NodeHealth(
+                message["shard"], info["connected"], stats, now
+            )
+            node = nodes.get(info["name"])
+            # the node stats are the same for all the shards, use them until the node sends its own
+            if node is not None and node.stats is None and stats is not None:
+                node.stats = stats
@@ -1,8 +1,9 @@
 import random
+import sys
 import asyncio
 import logging
 import typing as t
-from .objects import Track
+from .objects import Track, EMPTY_PLUGIN_INFO
 
 _LOG = logging.getLogger("lavaplay.utils")
 
@@ -20,8 +21,19 @@ def get_event_loop() -> asyncio.AbstractEventLoop:
     return loop
 
 
+def _intern(value: t.Optional[str]) -> t.Optional[str]:
+    # values repeated on every track share one string instead of a copy per track
+    return sys.intern(value) if value else value
+
+
+def _plugin_info(value: t.Optional[dict]) -> t.Mapping[str, t.Any]:
+    # most tracks have no plugin info, they share one empty mapping instead of a dict per track
+    return value if value else EMPTY_PLUGIN_INFO
+
+
 def prossing_tracks(tracks: list, result: str) -> t.List[Track]:
     list_tracks = []
+    load_type = _intern(result.get("loadType", None))
     for track in tracks:
         info = track["info"]
         encoded = track.get("encoded")
@@ -31,7 +43,7 @@ def prossing_tracks(tracks: list, result: str) -> t.List[Track]:
                 encoded=encoded,
                 identifier=info["identifier"],
                 is_seekable=info["isSeekable"],
-                author=info["author"],
+                author=_intern(info["author"]),
                 length=info["length"],
                 is_stream=info["isStream"],
                 position=info["position"],
@@ -39,8 +51,9 @@ def prossing_tracks(tracks: list, result: str) -> t.List[Track]:
                 uri=info["uri"],
                 artworkUrl=info.get("artworkUrl", None),
                 isrc=info.get("isrc", None),
-                plugin_info=track["pluginInfo"],
-                load_type=result.get("loadType", None)
+                source_name=_intern(info.get("sourceName", None)),
+                plugin_info=_plugin_info(track["pluginInfo"]),
+                load_type=load_type
             )
         )
     return list_tracks
@@ -60,7 +73,7 @@ def prossing_single_track(track: dict, result: str) -> t.List[Track]:
         encoded=track["encoded"],
         identifier=info["identifier"],
         is_seekable=info["isSeekable"],
-        author=info["author"],
+        author=_intern(info["author"]),
         length=info["length"],
         is_stream=info["isStream"],
         position=info["position"],
@@ -69,7 +82,7 @@ def prossing_single_track(track: dict, result: str) -> t.List[Track]:
         uri=info["uri"],
         artworkUrl=info.get("artworkUrl", None),
         isrc=info.get("isrc", None),
-        plugin_info=track["pluginInfo"],
+        plugin_info=_plugin_info(track["pluginInfo"]),
         load_type=result.get("loadType", None)
     )]
 
@@ -88,7 +101,7 @@ def event_track(track: dict):
         encoded=track["encoded"],
         identifier=info["identifier"],
         is_seekable=info["isSeekable"],
-        author=info["author"],
+        author=_intern(info["author"]),
         length=info["length"],
         is_stream=info["isStream"],
         position=info["position"],
@@ -97,7 +110,7 @@ def event_track(track: dict):
         uri=info["uri"],
         artworkUrl=info.get("artworkUrl", None),
         isrc=info.get("isrc", None),
-        plugin_info=track["pluginInfo"],
+        plugin_info=_plugin_info(track["pluginInfo"]),
         load_type=track.get("loadType", None)
     )]
 
@@ -1,17 +1,14 @@
 import asyncio
+import random
 import aiohttp
 import logging
-from .utlits import event_track
-from .objects import (
-    Stats, Cpu, Memory, FrameStats
-)
+from collections import deque
 from .events import (
-    TrackEndEvent, TrackExceptionEvent, TrackStuckEvent, 
-    TrackStartEvent, ReadyEvent, PlayerState, 
-    PlayerUpdateEvent, StatsUpdateEvent, TrackException,
-    WebSocketClosedEvent
+    StatsUpdateEvent, NodeDisconnectedEvent, NodeReconnectingEvent, PlayerUpdateBatchEvent
 )
+from . import schemas
 from .emitter import Emitter
+from . import jsonlib
 import typing as t
 from . import __version__
 if t.TYPE_CHECKING:
@@ -30,8 +27,14 @@ class WS:
         user_id: int = None,
         shards_count: int = None,
         loop: t.Optional[asyncio.AbstractEventLoop] = None,
+        reconnect_attempts: t.Optional[int] = None,
+        reconnect_backoff: float = 1.0,
+        reconnect_backoff_max: float = 60.0,
+        player_update_interval: t.Optional[float] = None,
+        max_pending_frames: int = 1000,
     ) -> None:
         self.ws = None
+        self.session: t.Optional[aiohttp.ClientSession] = None
         self.ws_url = f"{'wss' if ssl else 'ws'}://{host}:{port}/v4/websocket"
         self.node = node
         self._headers = {
@@ -44,151 +47,219 @@ class WS:
         self.emitter: Emitter = node.event_manager
         self.is_connect: bool = False
         self._session_id: str = None
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_backoff = reconnect_backoff
+        self.reconnect_backoff_max = reconnect_backoff_max
+        self._closing = False
+        # guild id -> frames waiting for the drain task of the guild, a guild has a mailbox only while it has frames.
+        self._mailboxes: t.Dict[t.Optional[str], t.Deque[dict]] = {}
+        # the frames read and not handled yet, the reader waits while there are max_pending_frames
+        self.max_pending_frames = max_pending_frames
+        self._pending_frames = 0
+        self._frames_space: t.Optional[asyncio.Event] = None
+        self.player_update_interval = player_update_interval
+        # guild id -> last player update payload not dispatched yet, used with player_update_interval.
+        self._player_updates: t.Dict[int, dict] = {}
+        self._player_updates_flush: t.Optional[asyncio.Task] = None
     
     @property
     def session_id(self) -> str:
         return self._session_id
 
     async def _connect(self):
-        async with aiohttp.ClientSession(headers=self._headers, loop=self._loop) as session:
-            self.session = session
+        # one session for the whole life of the websocket, reconnects reuse it
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(headers=self._headers)
+        try:
+            await self._run()
+        finally:
+            await self.session.close()
+
+    async def _run(self):
+        attempt = 0
+        while not self._closing:
             _LOG.info(f"Connecting to websocket {self.ws_url}")
+            headers = {}
+            resume_session_id = self.node.resume_session_id
+            if resume_session_id:
+                headers["Session-Id"] = resume_session_id
             try:
-                self.ws = await self.session.ws_connect(self.ws_url)
-                if session is None:
-                    await self.check_connection()
-            except (aiohttp.ClientConnectorError, aiohttp.WSServerHandshakeError, aiohttp.ServerDisconnectedError) as error:
-                if isinstance(error, (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError)):
-                    _LOG.error(f"Could not connect to websocket: {error}")
-                    _LOG.warning("Reconnecting to websocket after 10 seconds")  
-                    await asyncio.sleep(10)
-                    await self._connect()
+                self.ws = await self.session.ws_connect(self.ws_url, headers=headers)
+            except aiohttp.WSServerHandshakeError as error:
+                if error.status in (403, 401):  # Unauthorized or Forbidden
+                    _LOG.warning("Password authentication failed - closing websocket")
+                    return
+                # like a 502 or 503 from a proxy while lavalink restarts, retried with the backoff
+                _LOG.error(f"Websocket handshake failed with status {error.status}, check your websocket port")
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as error:
+                _LOG.error(f"Could not connect to websocket: {error}")
+            else:
+                attempt = 0
+                self.is_connect = True
+                await self._listen()
+                self.is_connect = False
+                if self._closing:
                     return
-                elif isinstance(error, aiohttp.WSServerHandshakeError):
-                    if error.status in (403, 401):  # Unauthorized or Forbidden
-                        _LOG.warning("Password authentication failed - closing websocket")
-                        return
-                    _LOG.warning("Please check your websocket port - closing websocket")
-            self.is_connect = True
-
-            async for msg in self.ws:
-                if msg.type == aiohttp.WSMsgType.TEXT:
-                    self._loop.create_task(self.callback(msg.json()))
-                elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED):
-                    _LOG.error("Websocket closed")
-                    break
-                elif msg.type == aiohttp.WSMsgType.ERROR:
-                    _LOG.error(msg.data)
-                    break
-
-            self.is_connect = False
-            await self._connect()
-
-    async def check_connection(self):
-        while self.ws.closed is None or not self.ws.closed or not self.is_connected:
-            _LOG.warning("Websocket closed unexpectedly - reconnecting in 10 seconds")
-            if self.node.nodes:
-                self.node.nodes.clear()
-            await asyncio.sleep(10)
-            await self._connect()
+                self.emitter.emit("NodeDisconnectedEvent", NodeDisconnectedEvent(self.node))
+
+            if self.reconnect_attempts is not None and attempt >= self.reconnect_attempts:
+                _LOG.error(f"Could not reconnect to websocket after {attempt} attempts - closing websocket")
+                return
+            attempt += 1
+            delay = self._backoff(attempt)
+            _LOG.warning(f"Reconnecting to websocket after {delay:.1f} seconds (attempt {attempt})")
+            self.emitter.emit("NodeReconnectingEvent", NodeReconnectingEvent(self.node, attempt, delay))
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        # exponential backoff with jitter, so clients don't reconnect at the same moment after a restart
+        delay = min(self.reconnect_backoff_max, self.reconnect_backoff * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+    async def _listen(self):
+        async for msg in self.ws:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                if self._pending_frames >= self.max_pending_frames:
+                    # the listeners are behind, stop reading so the socket pushes back on lavalink
+                    if self._frames_space is None:
+                        self._frames_space = asyncio.Event()
+                    self._frames_space.clear()
+                    await self._frames_space.wait()
+                self._post(jsonlib.loads(msg.data))
+            elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED):
+                _LOG.error("Websocket closed")
+                break
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                _LOG.error(msg.data)
+                break
+
+    def _post(self, payload: dict):
+        # frames of a guild are handled one by one in the order received, different guilds run in parallel,
+        # the frames without a guild like ready and stats share one mailbox
+        guild_id = payload.get("guildId")
+        self._pending_frames += 1
+        mailbox = self._mailboxes.get(guild_id)
+        if mailbox is not None:
+            mailbox.append(payload)
+            return
+        self._mailboxes[guild_id] = deque((payload,))
+        self._loop.create_task(self._drain(guild_id))
+
+    async def _drain(self, guild_id: str):
+        mailbox = self._mailboxes[guild_id]
+        try:
+            while mailbox:
+                payload = mailbox.popleft()
+                try:
+                    await self.callback(payload)
+                except Exception:
+                    _LOG.exception(f"Error while handling {payload.get('op')} for guild {guild_id}")
+                finally:
+                    self._pending_frames -= 1
+                    if self._frames_space is not None and self._pending_frames < self.max_pending_frames:
+                        self._frames_space.set()
+        finally:
+            del self._mailboxes[guild_id]
+
+    async def close(self):
+        """
+        Close the websocket and its session, no reconnect is made after.
+        """
+        self._closing = True
+        if self._player_updates_flush is not None:
+            self._player_updates_flush.cancel()
+        if self.ws is not None:
+            await self.ws.close()
+        if self.session is not None:
+            await self.session.close()
 
     async def callback(self, payload: dict):
+        op = payload["op"]
         # https://lavalink.dev/api/websocket.html#ready-op
-        if payload["op"] == "ready":
+        if op == "ready":
             _LOG.info("Lavalink client is ready")
-            self._session_id = payload["sessionId"]
+            event = schemas.READY.decode(payload)
+            self._session_id = event.sessionId
             self.node.session_id = self._session_id
+            self.node._save_session()
             await self.node.rest.update_session(
                 self._session_id,
                 data={
-                    "resuming": False,
+                    "resuming": self.node.resuming,
                     "timeout": self.node._resume_timeout or 180
                 }
             )
-            if payload["resumed"] is True:
+            if event.resumed is True:
                 _LOG.info("Lavalink client resumed session successfully")
+                await self.node._restore_players()
             else:
                 _LOG.info("Lavalink client started a new session successfully")
-            self.emitter.emit("ReadyEvent", data=ReadyEvent.from_kwargs(**payload))
+            await self.emitter.dispatch("ReadyEvent", event)
         
         # https://lavalink.dev/api/websocket.html#player-update-op
-        elif payload["op"] == "playerUpdate":
-            payload.pop("op")
+        elif op == "playerUpdate":
             guild_id = int(payload["guildId"])
             player = self.node.get_player(guild_id)
             if player is None:
                 return
-            position = payload["state"].get("position")
-            position = position / 1000 if isinstance(position, int) else None
+            state = payload["state"]
             if player.queue:
-                player.queue[0].position = position
-            payload["state"]["position"] = position
-            payload["state"] = PlayerState.from_kwargs(**payload["state"])
-            data = PlayerUpdateEvent.from_kwargs(**payload)
-            self.emitter.emit("PlayerUpdateEvent", data)
+                player.queue[0].position = state.get("position", 0) / 1000
+            player._update_state(state.get("position", 0), state.get("time", 0))
+            if self.player_update_interval is not None:
+                self._player_updates[guild_id] = payload
+                if self._player_updates_flush is None:
+                    self._player_updates_flush = self._loop.create_task(self._flush_player_updates())
+            # no event is made for nobody
+            elif self.emitter.has_listeners("PlayerUpdateEvent"):
+                await self.emitter.dispatch("PlayerUpdateEvent", schemas.PLAYER_UPDATE.decode(payload))
         
         # https://lavalink.dev/api/websocket.html#stats-op
-        elif payload["op"] == "stats":
-            payload.pop("op")
-            # Fix types
-            if payload.get("frameStats") is not None:
-                payload["frameStats"] = FrameStats.from_kwargs(**payload["frameStats"])
-            payload["memory"] = Memory.from_kwargs(**payload["memory"])
-            payload["cpu"] = Cpu.from_kwargs(**payload["cpu"])
-            self.node.stats = Stats.from_kwargs(**payload)
-            self.emitter.emit("StatsUpdateEvent", StatsUpdateEvent(self.node.stats))
+        elif op == "stats":
+            self.node.stats = schemas.STATS.decode(payload)
+            await self.emitter.dispatch("StatsUpdateEvent", StatsUpdateEvent(self.node.stats))
 
         # https://lavalink.dev/api/websocket.html#event-op
-        elif payload["op"] == "event" and payload.get("track") is not None:
+        elif op == "event":
             await self.event_dispatch(payload)
             
-    async def event_dispatch(self, payload: dict):
-        # encodedTrack is for Lavalink new version v4
-        if payload["track"]["encoded"]:
-            track = payload["track"]
-        event = payload["type"]
-
-        guild_id = int(payload["guildId"])
-        payload.pop("op")
-        payload.pop("type")
-        payload.pop("guildId")
-        payload["guild_id"] = guild_id
-
-        player = self.node.get_player(guild_id)
-
-        if event == "TrackStartEvent":
-            self.emitter.emit("TrackStartEvent", TrackStartEvent(event_track(track), guild_id))
-
-        elif event == "TrackEndEvent":
-            self.emitter.emit("TrackEndEvent", TrackEndEvent(event_track(track), guild_id, payload["reason"]))
-            # reason = payload["reason"]
-            if not player or not player.queue:
-                return
-            if player.is_queue_repeat:
-                player.queue.append(player.queue.pop(0))
-                if len(player.queue) == 0:
-                    return
-                await player.play(player.queue[0], player.queue[0].requester, True)
-                return
-            if player.is_repeat:
-                await player.play(track, player.queue[0].requester, True)
-                return
-            player.queue.pop(0)
-            if len(player.queue) != 0:
-                await player.play(player.queue[0], player.queue[0].requester, True)
-
-        elif event == "TrackExceptionEvent":
-            payload["exception"] = TrackException.from_kwargs(**payload["exception"])
-            self.emitter.emit("TrackExceptionEvent", TrackExceptionEvent.from_kwargs(**payload))
+    async def _flush_player_updates(self):
+        # the updates of the interval are dispatched together, a guild gets at most one update by interval
+        try:
+            await asyncio.sleep(self.player_update_interval / 1000)
+        finally:
+            self._player_updates_flush = None
+        payloads, self._player_updates = self._player_updates, {}
+        single = self.emitter.has_listeners("PlayerUpdateEvent")
+        batch = self.emitter.has_listeners("PlayerUpdateBatchEvent")
+        if not payloads or not (single or batch):
+            return
+        updates = [schemas.PLAYER_UPDATE.decode(payload) for payload in payloads.values()]
+        if single:
+            for event in updates:
+                await self.emitter.dispatch("PlayerUpdateEvent", event)
+        if batch:
+            await self.emitter.dispatch("PlayerUpdateBatchEvent", PlayerUpdateBatchEvent(updates))
 
-        elif event == "TrackStuckEvent":
-            self.emitter.emit("TrackStuckEvent", TrackStuckEvent.from_kwargs(**payload))
+    async def event_dispatch(self, payload: dict):
+        event_type = payload["type"]
+        schema = schemas.EVENTS.get(event_type)
+        if schema is None:
+            _LOG.warning(f"Unknown event: {event_type}")
+            return
+        event = schema.decode(payload)
+        player = self.node.get_player(event.guild_id)
+        if player is not None and event_type == "TrackStartEvent":
+            player._track_started()
+        elif player is not None and event_type == "TrackEndEvent" and player.prefetch:
+            # the next track is ready, it is sent before the listeners run to keep the gap short
+            await player._play_next()
+            player = None
+        await self.emitter.dispatch(event_type, event)
 
-        elif event == "WebSocketClosedEvent":
-            self.emitter.emit("WebSocketClosedEvent", WebSocketClosedEvent.from_kwargs(**payload))
-        
-        else:
-            _LOG.warning(f"Unknown event: {event}")
+        if event_type != "TrackEndEvent" or not player:
+            return
+        await player._play_next()
 
     @property
     def is_connected(self) -> bool:
@@ -202,8 +273,7 @@ class WS:
             _LOG.error("Not connected to websocket")
             return
         try:
-            await self.ws.send_json(payload)
+            await self.ws.send_str(jsonlib.dumps(payload))
         except ConnectionResetError:
+            # the reconnect loop in :meth:`_connect` takes over once the read loop ends
             _LOG.error("ConnectionResetError: Cannot write to closing transport")
-            await self.check_connection()
-            return
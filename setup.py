@@ -40,6 +40,7 @@ setup(
     keywords='lavalink, discord, discord-lavalink, lavaplay, lavaplay.py',
     packages=["lavaplay"],
     install_requires=["aiohttp"],
+    extras_require={"speedups": ["orjson"]},
     project_urls={
         'Bug Reports': 'https://github.com/HazemMeqdad/lavaplay.py/issues',
         'Source': 'https://github.com/HazemMeqdad/lavaplay.py/',
@@ -0,0 +1,87 @@
+"""
+A small lavalink v4 server for the tests, it records the requests and lets the tests drop the websockets.
+"""
+import asyncio
+import typing as t
+
+from aiohttp import web
+
+
+def track_payload(identifier: str) -> dict:
+    return {
+        "encoded": f"encoded-{identifier}",
+        "info": {
+            "identifier": identifier, "isSeekable": True, "author": "author", "length": 180000,
+            "isStream": False, "position": 0, "title": identifier, "uri": "uri", "artworkUrl": None,
+            "isrc": None, "sourceName": "youtube"
+        },
+        "pluginInfo": {}
+    }
+
+
+class FakeLavalink:
+    def __init__(self, session_id: str = "session") -> None:
+        self.session_id = session_id
+        self.port: t.Optional[int] = None
+        # guild id -> the bodies of the player updates
+        self.patches: t.Dict[str, t.List[dict]] = {}
+        self.deleted: t.List[str] = []
+        self.sockets: t.List[web.WebSocketResponse] = []
+        self._runner: t.Optional[web.AppRunner] = None
+
+    async def _websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.append(ws)
+        await ws.send_json({"op": "ready", "resumed": False, "sessionId": self.session_id})
+        async for _ in ws:
+            pass
+        return ws
+
+    async def _update_player(self, request: web.Request) -> web.Response:
+        guild_id = request.match_info["guild_id"]
+        self.patches.setdefault(guild_id, []).append(await request.json())
+        return web.json_response({
+            "guildId": guild_id, "track": None, "volume": 100, "paused": False,
+            "state": {"time": 0, "position": 0, "connected": True, "ping": 5}, "voice": {}, "filters": {}
+        })
+
+    async def _destroy_player(self, request: web.Request) -> web.Response:
+        self.deleted.append(request.match_info["guild_id"])
+        return web.Response(status=204)
+
+    async def _update_session(self, request: web.Request) -> web.Response:
+        return web.json_response(await request.json())
+
+    async def _load_tracks(self, request: web.Request) -> web.Response:
+        identifier = request.query["identifier"]
+        return web.json_response({"loadType": "search", "data": [track_payload(identifier)]})
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/v4/websocket", self._websocket)
+        app.router.add_patch("/v4/sessions/{session_id}/players/{guild_id}", self._update_player)
+        app.router.add_delete("/v4/sessions/{session_id}/players/{guild_id}", self._destroy_player)
+        app.router.add_patch("/v4/sessions/{session_id}", self._update_session)
+        app.router.add_get("/v4/loadtracks", self._load_tracks)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def send(self, payload: dict) -> None:
+        """
+        Send a message to the connected clients.
+        """
+        for ws in self.sockets:
+            await ws.send_json(payload)
+
+    async def drop_websockets(self) -> None:
+        for ws in self.sockets:
+            await ws.close()
+        self.sockets.clear()
+
+    async def stop(self) -> None:
+        await self.drop_websockets()
+        await self._runner.cleanup()
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+from lavaplay import Lavalink
+from lavaplay.objects import Filters
+from lavaplay.utlits import prossing_single_track
+from tests.fake_lavalink import FakeLavalink, track_payload
+
+GUILD_ID = 10
+
+
+async def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        await asyncio.sleep(0.01)
+
+
+def test_failover_moves_player():
+    async def run():
+        server_a, server_b = FakeLavalink("session-a"), FakeLavalink("session-b")
+        await server_a.start()
+        await server_b.start()
+        loop = asyncio.get_running_loop()
+        lavalink = Lavalink()
+        node_a = lavalink.create_node(
+            "127.0.0.1", server_a.port, "password", 1, name="A", loop=loop, reconnect_backoff=5
+        )
+        node_b = lavalink.create_node("127.0.0.1", server_b.port, "password", 1, name="B", loop=loop)
+        try:
+            node_a.connect()
+            await wait_for(lambda: node_a.session_id == "session-a")
+            player = node_a.create_player(GUILD_ID)
+            await player.raw_voice_state_update(1, "voice-session", 99)
+            await player.raw_voice_server_update("wss://endpoint", "token")
+            track = prossing_single_track(track_payload("song"), {"loadType": "track"})[0]
+            await player.play(track)
+            await player.volume(50)
+            filters = Filters()
+            filters.timescale(speed=1.0, pitch=1.2, rate=1.0)
+            await player.filters(filters)
+            await player.pause(True)
+            await server_a.send({
+                "op": "playerUpdate", "guildId": str(GUILD_ID),
+                "state": {"time": 1, "position": 12500, "connected": True, "ping": 1}
+            })
+            await wait_for(lambda: player.position == 12500)
+
+            node_b.connect()
+            await wait_for(lambda: node_b.session_id == "session-b")
+            await server_a.drop_websockets()
+            await wait_for(lambda: server_b.patches)
+            await asyncio.sleep(0.1)
+
+            assert lavalink.get_player(GUILD_ID).node is node_b
+            assert GUILD_ID not in node_a.players
+            # the old node is not reachable, its player is not destroyed
+            assert server_a.deleted == []
+            assert server_b.patches == {str(GUILD_ID): [{
+                "volume": 50,
+                "paused": True,
+                "filters": filters._payload,
+                "voice": {"token": "token", "sessionId": "voice-session", "endpoint": "endpoint", "channelId": "99"},
+                "track": {"encoded": "encoded-song"},
+                "position": 12500,
+            }]}
+        finally:
+            await node_a.close()
+            await node_b.close()
+            await server_a.stop()
+            await server_b.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from lavaplay.node_manager import Node
+from lavaplay.objects import LazyTrack
+from tests.test_position import make_track
+
+
+def track_payload(identifier: str) -> dict:
+    return {
+        "encoded": f"encoded-{identifier}",
+        "info": {
+            "identifier": identifier, "isSeekable": True, "author": "author", "length": 180000,
+            "isStream": False, "position": 0, "title": identifier, "uri": "uri", "sourceName": "youtube"
+        },
+        "pluginInfo": {}
+    }
+
+
+class FakeRest:
+    def __init__(self, failing: set) -> None:
+        self.failing = failing
+        self.updates = []
+
+    async def load_tracks(self, identifier: str) -> dict:
+        query = identifier.split(":", 1)[1]
+        if query in self.failing:
+            raise ConnectionError(f"Could not load {query}")
+        return {"loadType": "search", "data": [track_payload(query)]}
+
+    async def update_player(self, session_id, guild_id, data):
+        self.updates.append(data)
+        return {"state": {"connected": True, "ping": 1}}
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def make_node(loop, failing: set) -> Node:
+    node = Node(port=2333, password="password", user_id=1, loop=loop)
+    node.rest = FakeRest(failing)
+    node.session_id = "session"
+    return node
+
+
+def test_resolve_error_returns_none(loop):
+    node = make_node(loop, {"a"})
+    assert loop.run_until_complete(node.resolve_track(LazyTrack("a"))) is None
+    track = loop.run_until_complete(node.resolve_track(LazyTrack("b", requester=5)))
+    assert track.encoded == "encoded-b"
+    assert track.requester == 5
+
+
+def test_play_next_skips_failed_entry(loop):
+    node = make_node(loop, {"a"})
+    player = node.create_player(1)
+    player.queue.extend([make_track(), LazyTrack("a"), LazyTrack("b")])
+    loop.run_until_complete(player._play_next())
+    assert [track.encoded for track in player.queue] == ["encoded-b"]
+    assert node.rest.updates == [{"track": {"encoded": "encoded-b"}}]
+
+
+def test_play_next_all_failed(loop):
+    node = make_node(loop, {"a", "b"})
+    player = node.create_player(1)
+    player.queue.extend([make_track(), LazyTrack("a"), LazyTrack("b")])
+    loop.run_until_complete(player._play_next())
+    assert len(player.queue) == 0
+    assert node.rest.updates == []
@@ -0,0 +1,136 @@
+import asyncio
+import types
+
+import pytest
+
+from lavaplay.objects import Filters, Track
+from lavaplay.player import Player
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeRest:
+    def __init__(self) -> None:
+        self.updates = []
+
+    async def update_player(self, session_id, guild_id, data):
+        self.updates.append(data)
+        return {"state": {"connected": True, "ping": 1}}
+
+
+def make_track(length: int = 180000, is_stream: bool = False) -> Track:
+    return Track(
+        encoded="QAAA", identifier="id", is_seekable=True, author="author", length=length,
+        is_stream=is_stream, position=0, title="title", uri="uri", artworkUrl="", isrc="",
+        plugin_info="", load_type="track"
+    )
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def player(clock):
+    loop = asyncio.new_event_loop()
+    node = types.SimpleNamespace(
+        rest=FakeRest(), user_id=1, loop=loop, session_id="session", queue_store=None, prefetch=0
+    )
+    player = Player(node, 1)
+    player._clock = clock
+    yield player
+    loop.close()
+
+
+def run(player, coro):
+    return player.loop.run_until_complete(coro)
+
+
+def test_no_track(player, clock):
+    clock.advance(10)
+    assert player.position == 0
+
+
+def test_play(player, clock):
+    run(player, player.play(make_track()))
+    assert player.position == 0
+    clock.advance(2.5)
+    assert player.position == 2500
+
+
+def test_pause_and_resume(player, clock):
+    run(player, player.play(make_track()))
+    clock.advance(3)
+    run(player, player.pause(True))
+    clock.advance(10)
+    assert player.position == 3000
+    run(player, player.pause(False))
+    clock.advance(1)
+    assert player.position == 4000
+
+
+def test_timescale(player, clock):
+    run(player, player.play(make_track()))
+    clock.advance(2)
+    filters = Filters()
+    filters.timescale(speed=1.5, pitch=1.0, rate=2.0)
+    run(player, player.filters(filters))
+    assert player.speed == 3.0
+    clock.advance(1)
+    # 2 seconds at the normal speed and 1 second at speed * rate
+    assert player.position == 5000
+
+
+def test_seek(player, clock):
+    run(player, player.play(make_track()))
+    clock.advance(5)
+    run(player, player.seek(60000))
+    assert player.position == 60000
+    clock.advance(1)
+    assert player.position == 61000
+
+
+def test_stop(player, clock):
+    run(player, player.play(make_track()))
+    clock.advance(5)
+    run(player, player.stop())
+    clock.advance(5)
+    assert player.position == 0
+
+
+def test_player_update(player, clock):
+    run(player, player.play(make_track()))
+    player._update_state(30000, 2000)
+    clock.advance(1)
+    assert player.position == 31000
+
+
+def test_stale_player_update(player, clock):
+    run(player, player.play(make_track()))
+    player._update_state(30000, 2000)
+    player._update_state(10000, 1000)
+    assert player.position == 30000
+    clock.advance(1)
+    assert player.position == 31000
+
+
+def test_clamp_to_length(player, clock):
+    run(player, player.play(make_track(length=10000)))
+    clock.advance(60)
+    assert player.position == 10000
+
+
+def test_stream_not_clamped(player, clock):
+    run(player, player.play(make_track(length=0, is_stream=True)))
+    clock.advance(60)
+    assert player.position == 60000
@@ -0,0 +1,19 @@
+import itertools
+
+import pytest
+
+from lavaplay.queue import Queue
+
+BOUNDS = [None, -25, -12, -3, -1, 0, 1, 2, 5, 11, 30]
+STEPS = [None, 1, 2, 3, -1, -2, -5]
+
+
+@pytest.mark.parametrize("consumed", [0, 1, 7])
+def test_slices_match_list(consumed):
+    queue = Queue(range(-consumed, 12))
+    for _ in range(consumed):
+        queue.popleft()
+    expected = list(range(12))
+    assert list(queue) == expected
+    for start, stop, step in itertools.product(BOUNDS, BOUNDS, STEPS):
+        assert queue[start:stop:step] == expected[start:stop:step]
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import types
+
+import pytest
+
+from lavaplay.objects import LazyTrack
+from lavaplay.player import Player
+from lavaplay.queue_store import LogQueueStore, MemoryQueueStore, SQLiteQueueStore
+from tests.test_position import FakeRest
+
+
+async def apply_ops(store) -> None:
+    await store.append(1, [(f"encoded-{i}", i) for i in range(20)])
+    await store.popleft(1)
+    await store.rotate(1)
+    await store.remove(1, 3)
+    await store.shuffle(1, 1, 42)
+    await store.append(2, [("encoded", None)])
+    await store.clear(2)
+
+
+@pytest.mark.parametrize("make_store", [
+    lambda path: LogQueueStore(os.path.join(path, "queue.log"), compact_after=4),
+    lambda path: SQLiteQueueStore(os.path.join(path, "queue.db")),
+])
+def test_same_as_memory_store(tmp_path, make_store):
+    async def run():
+        memory = MemoryQueueStore()
+        await apply_ops(memory)
+        store = make_store(str(tmp_path))
+        await apply_ops(store)
+        assert await store.load(1) == await memory.load(1)
+        assert await store.load(2) == []
+        store.close()
+        # a new store reads the saved queues
+        store = make_store(str(tmp_path))
+        assert await store.load(1) == await memory.load(1)
+        store.close()
+
+    asyncio.run(run())
+
+
+class SlowClearStore(MemoryQueueStore):
+    async def clear(self, guild_id: int) -> None:
+        await asyncio.sleep(0.05)
+        await super().clear(guild_id)
+
+
+def test_change_while_restoring():
+    async def run():
+        store = SlowClearStore()
+        await store.append(1, [("lazy:ytsearch:saved 1", None), ("lazy:ytsearch:saved 2", None)])
+        loop = asyncio.get_running_loop()
+        node = types.SimpleNamespace(
+            rest=FakeRest(), user_id=1, loop=loop, session_id="session", queue_store=store, prefetch=0
+        )
+        player = Player(node, 1)
+        player._start_restore_queue()
+        # added before the restore, the store is written again in full
+        player._enqueue([LazyTrack("new")])
+        await asyncio.sleep(0.01)
+        # the playing track ends while the store is rewritten
+        player._advance()
+        while player._store_task is not None:
+            await asyncio.sleep(0.01)
+        assert [entry.identifier for entry in player.queue] == ["ytsearch:saved 1", "ytsearch:saved 2"]
+        assert await store.load(1) == [("lazy:ytsearch:saved 1", None), ("lazy:ytsearch:saved 2", None)]
+
+    asyncio.run(run())